@@ -201,9 +201,12 @@ df_companies.describe()
 # Create a new column "Year Joined" from "Date Joined".
 
 
-df_companies['Date Joined'] = pd.to_datetime(df_companies['Date Joined'])
+# `Date Joined` is stored as M/D/YY. Parsing with an explicit format, once per
+# distinct date, avoids pandas inferring the format row by row.
 
-df_companies['Year Joined'] = df_companies['Date Joined'].dt.year
+from dates import parse_dates_with_year
+
+df_companies['Date Joined'], df_companies['Year Joined'] = parse_dates_with_year(df_companies['Date Joined'])
 
 df_companies.info()
 
@@ -307,10 +310,14 @@ def str_to_num(x):
 # In[9]:
 
 
-# Apply the `str_to_num()` function to the `Valuation` column
-# and assign the result back to a new column called `valuation_num`
+# Convert the `Valuation` column to numbers (in billions) and assign the
+# result back to a new column called `valuation_num`. `parse_money()` gives
+# the same values as `apply(str_to_num)` but parses each distinct string once
+# instead of calling Python for every row.
+
+from money import parse_money
 
-df_companies['valuation_num'] = df_companies['Valuation'].apply(str_to_num)
+df_companies['valuation_num'] = parse_money(df_companies['Valuation'])
 df_companies['valuation_num']
 
 
@@ -581,9 +588,14 @@ count_dropna_columns
 # In[19]:
 
 
-# 1. Fill missing values using the 'fillna()' method, back-filling
+# 1. Fill missing values. Back-filling copies the next row's city or country,
+# which belongs to an unrelated company, so fill from the company's own
+# country/city instead (learned from the full table).
+
+from impute import impute
 
-df_companies_backfill = df_missing_rows.fillna(method='backfill')
+df_companies_backfill, impute_report = impute(df_missing_rows, reference=df_companies)
+impute_report
 
 # 2. Show the rows that previously had missing values
 
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Benchmark opening the companies table from CSV, Parquet and the binary store.
+
+Each size is a synthetic table written once in all three formats to a
+temporary directory; the timings are for loading it back (all columns, then
+a two-column projection).
+
+Usage:
+
+    python bench_binstore.py --rows 10K,1M,10M
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchutil import best_of, parse_rows, report
+from binstore import BinaryStore, verify, write_store
+from loader import SCHEMA, clean_companies, load_companies
+from synth import generate
+from table_cache import read_cache
+
+PROJECTION = ['Country/Region', 'valuation_num']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for n_rows in parse_rows(args.rows):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = generate(n_rows)
+            csv_path = os.path.join(tmp, "companies.csv")
+            raw.to_csv(csv_path, index=False)
+            df = clean_companies(raw.astype(SCHEMA))
+            parquet_path = os.path.join(tmp, "companies.parquet")
+            df.to_parquet(parquet_path, engine="pyarrow", index=False)
+            store_path = write_store(df, os.path.join(tmp, "companies.store"))
+            verify(df, store_path)
+            print(f"--- {n_rows:,} rows")
+
+            seconds, _ = best_of(lambda: load_companies(csv_path), 1)
+            report("load_companies (CSV)", seconds, n_rows)
+            seconds, _ = best_of(lambda: read_cache(parquet_path), args.repeat)
+            report("read_cache (Parquet)", seconds, n_rows)
+            seconds, _ = best_of(lambda: BinaryStore(store_path).frame(), args.repeat)
+            report("BinaryStore.frame", seconds, n_rows)
+
+            seconds, expected = best_of(lambda: read_cache(parquet_path, columns=PROJECTION), args.repeat)
+            report("read_cache (2 columns)", seconds, n_rows)
+            seconds, projected = best_of(lambda: BinaryStore(store_path).frame(PROJECTION), args.repeat)
+            report("BinaryStore.frame (2 columns)", seconds, n_rows)
+            assert np.array_equal(projected['valuation_num'], expected['valuation_num'])
+
+            def total_by_code():
+                store = BinaryStore(store_path)
+                codes = store.codes('Country/Region')
+                return np.bincount(codes[codes >= 0], weights=store.values('valuation_num')[codes >= 0])
+
+            seconds, _ = best_of(total_by_code, args.repeat)
+            report("valuation by country code (memmap)", seconds, n_rows)
+
+
+if __name__ == "__main__":
+    main()
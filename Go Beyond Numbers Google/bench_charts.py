@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Benchmark end-to-end chart time: raw ``sns.barplot`` vs pre-aggregated summaries.
+
+Raw seaborn bootstraps over every row, so it is skipped above ``--raw-max-rows``.
+
+Usage:
+
+    python bench_charts.py --rows 1K,1M,10M
+"""
+
+import argparse
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from benchutil import best_of, parse_rows, scale_frame  # noqa: E402
+from chart_data import barplot_summary, summarize  # noqa: E402
+from loader import load_companies  # noqa: E402
+
+BY = 'Continent'
+
+
+def raw_chart(df):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    sns.barplot(data=df, x=BY, y='valuation_num', hue=BY, palette='viridis', legend=False, ax=ax)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def summary_chart(df):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    barplot_summary(summarize(df, BY, ci=95), BY, 'mean', ax=ax)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--raw-max-rows", default="1M", help="largest table drawn with raw seaborn")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    raw_max = parse_rows(args.raw_max_rows)[0]
+    sample = load_companies()[[BY, 'valuation_num']]
+    print(f"{'rows':>12} {'raw sns.barplot s':>18} {'summarize + plot s':>19}")
+    for n_rows in parse_rows(args.rows):
+        df = scale_frame(sample, n_rows)
+        raw = 'skipped'
+        if n_rows <= raw_max:
+            raw = f"{best_of(lambda: raw_chart(df), args.repeat)[0]:.3f}"
+        summary = best_of(lambda: summary_chart(df), args.repeat)[0]
+        print(f"{n_rows:>12,} {raw:>18} {summary:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""Benchmark ``CohortCube`` year-range slices against filtering and grouping the table.
+
+Usage:
+
+    python bench_cohorts.py --rows 10K,1M,10M
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchutil import best_of, parse_rows, report
+from cohorts import CohortCube, lag_quantiles, time_to_unicorn
+from loader import SCHEMA, clean_companies
+from synth import generate
+
+COLUMNS = ['Valuation', 'Date Joined', 'Industry', 'Country/Region', 'Year Founded']
+
+
+def scan_totals(df, start):
+    rows = df[df['Year Joined'] >= start]
+    return rows.groupby('Country/Region', observed=True)['valuation_num'].sum()
+
+
+def scan_quantiles(df, by):
+    lags = pd.Series(time_to_unicorn(df), index=df.index)
+    return lags.groupby(df[by], observed=True).quantile(0.5, interpolation='lower')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for n_rows in parse_rows(args.rows):
+        df = generate(n_rows)[COLUMNS].astype({column: SCHEMA[column] for column in COLUMNS})
+        df = clean_companies(df)
+        print(f"--- {n_rows:,} rows")
+        seconds, cube = best_of(lambda: CohortCube(df), 1)
+        report(f"build cube {cube.count.shape}", seconds, n_rows)
+
+        for start in (2021, 2015):
+            seconds, expected = best_of(lambda: scan_totals(df, start), args.repeat)
+            report(f"joined >= {start}: filter + groupby", seconds, n_rows)
+            seconds, totals = best_of(lambda: cube.totals(start=start), args.repeat)
+            report(f"joined >= {start}: cube slice", seconds, n_rows)
+            assert np.allclose(totals['valuation'].sort_index(), expected[expected.index.isin(totals.index)].sort_index())
+
+        seconds, expected = best_of(lambda: scan_quantiles(df, 'Industry'), 1)
+        report("median time to unicorn: groupby quantile", seconds, n_rows)
+        seconds, quantiles = best_of(lambda: lag_quantiles(df, 'Industry'), args.repeat)
+        report("median time to unicorn: lag histogram", seconds, n_rows)
+        assert (quantiles['q50'].sort_index() == expected.sort_index().to_numpy()).all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Benchmark ``Date Joined`` parsing: inferred format vs explicit format vs cached.
+
+Usage:
+
+    python bench_dates.py --rows 10K,1M,10M
+"""
+
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchutil import best_of, load_sample, parse_rows, report, scale_frame
+from dates import DATE_FORMAT, parse_dates_with_year
+
+
+def inferred(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        dates = pd.to_datetime(values)
+    return dates, dates.dt.year
+
+
+def explicit(values):
+    dates = pd.to_datetime(values, format=DATE_FORMAT)
+    return dates, dates.dt.year
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sample = load_sample()
+    for n_rows in parse_rows(args.rows):
+        values = scale_frame(sample[['Date Joined']], n_rows)['Date Joined']
+        print(f"--- {n_rows:,} rows ({values.nunique():,} distinct dates)")
+
+        seconds, (expected, expected_years) = best_of(lambda: inferred(values), args.repeat)
+        report("to_datetime (inferred) + .dt.year", seconds, n_rows)
+        seconds, _ = best_of(lambda: explicit(values), args.repeat)
+        report("to_datetime (format) + .dt.year", seconds, n_rows)
+        seconds, (dates, years) = best_of(lambda: parse_dates_with_year(values), args.repeat)
+        report("parse_dates_with_year (cached)", seconds, n_rows)
+
+        assert np.array_equal(dates, expected.to_numpy(dtype="datetime64[ns]"))
+        assert np.array_equal(years, expected_years.to_numpy())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""Benchmark ``FilterIndex`` queries against the activity's ``isin`` masks.
+
+Usage:
+
+    python bench_filter_index.py --rows 1K,1M,10M
+"""
+
+import argparse
+
+import numpy as np
+
+from benchutil import best_of, load_sample, parse_rows, scale_frame
+from filter_index import INDEX_COLUMNS, FilterIndex, scan_mask
+
+QUERIES = {
+    'hardware in Beijing/SF/London': {'Industry': 'Hardware', 'City': ['Beijing', 'San Francisco', 'London']},
+    'AI in London': {'Industry': 'Artificial intelligence', 'City': 'London'},
+    'fintech in Europe': {'Industry': 'Fintech', 'Continent': 'Europe'},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    sample = load_sample()[INDEX_COLUMNS]
+    for n_rows in parse_rows(args.rows):
+        df = scale_frame(sample, n_rows)
+        seconds, index = best_of(lambda: FilterIndex(df), 1)
+        print(f"--- {n_rows:,} rows (index build {seconds * 1e3:.1f} ms)")
+        print(f"{'query':<32} {'isin scan us':>14} {'index count us':>15} {'index rows us':>14}")
+        for label, filters in QUERIES.items():
+            scan_seconds, expected = best_of(lambda: scan_mask(df, filters), args.repeat)
+            count_seconds, count = best_of(lambda: index.count(filters), args.repeat)
+            rows_seconds, rows = best_of(lambda: index.rows(filters), args.repeat)
+            assert count == expected.sum() and np.array_equal(rows, np.flatnonzero(expected))
+            print(f"{label:<32} {scan_seconds * 1e6:>14.1f} {count_seconds * 1e6:>15.1f} {rows_seconds * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Benchmark ``fuzzy.FuzzyIndex`` searches and bulk matches against a scan of every name.
+
+Queries are table names with one character replaced or cut in half. The
+scan baseline (``difflib`` ratio against every distinct name) is only run on
+a few queries, since it is the cost the index avoids.
+
+Usage:
+
+    python bench_fuzzy.py --rows 10K,1M --queries 1000
+"""
+
+import argparse
+import difflib
+
+import numpy as np
+
+from benchutil import best_of, parse_rows, report
+from fuzzy import FuzzyIndex
+from loader import SCHEMA, clean_companies
+from synth import generate
+
+SCAN_QUERIES = 5
+
+
+def misspell(names, rng):
+    """One misspelled or truncated variant per name."""
+    queries = []
+    for name in names:
+        if rng.random() < 0.5:
+            queries.append(name[:max(3, len(name) // 2)])
+        else:
+            i = rng.integers(len(name))
+            queries.append(name[:i] + 'xq'[rng.integers(2)] + name[i + 1:])
+    return queries
+
+
+def scan(names, query):
+    return max(names, key=lambda name: difflib.SequenceMatcher(None, query, name).ratio())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M", help="comma-separated row counts")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    for n_rows in parse_rows(args.rows):
+        df = clean_companies(generate(n_rows).astype(SCHEMA))
+        print(f"--- {n_rows:,} rows")
+        seconds, index = best_of(lambda: FuzzyIndex(df), 1)
+        report("build Company + City index", seconds, n_rows)
+
+        names = index.indexes['Company'].names
+        queries = misspell(rng.choice(names, size=args.queries), rng)
+        seconds, _ = best_of(lambda: [index.search(query, k=5) for query in queries], args.repeat)
+        print(f"{'search Company, k=5':<40} {seconds / len(queries) * 1e3:10.3f} ms/query")
+        city_queries = misspell(rng.choice(index.indexes['City'].names, size=args.queries), rng)
+        seconds, _ = best_of(lambda: [index.search(query, column='City', k=5) for query in city_queries],
+                             args.repeat)
+        print(f"{'search City, k=5':<40} {seconds / len(queries) * 1e3:10.3f} ms/query")
+        seconds, matches = best_of(lambda: index.match(queries), args.repeat)
+        print(f"{'match (bulk, best per name)':<40} {seconds / len(queries) * 1e3:10.3f} ms/query"
+              f"   {matches['match'].notna().mean():.1%} matched")
+
+        seconds, _ = best_of(lambda: [scan(names, query) for query in queries[:SCAN_QUERIES]], 1)
+        print(f"{'difflib scan of every name':<40} {seconds / SCAN_QUERIES * 1e3:10.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
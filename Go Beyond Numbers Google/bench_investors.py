@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Benchmark ``InvestorGraph`` lookups against substring scans of ``Select Investors``.
+
+Runs on synthetic tables from ``synth.generate``, so every row has its own
+investor list.
+
+Usage:
+
+    python bench_investors.py --rows 10K,1M
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchutil import best_of, parse_rows, report
+from investors import InvestorGraph
+from money import parse_money
+from synth import generate
+
+INVESTOR = 'Sequoia Capital'
+
+
+def scan_portfolio(df, investor):
+    # Split rather than ``str.contains`` so "Sequoia Capital China" does not match.
+    lists = df['Select Investors'].str.split(', ')
+    return np.flatnonzero(lists.apply(lambda names: isinstance(names, list) and investor in names).to_numpy())
+
+
+def scan_total_valuation(df):
+    edges = df[['Select Investors', 'valuation_num']].assign(
+        investor=df['Select Investors'].str.split(',')).explode('investor')
+    names = edges['investor'].str.strip()
+    return edges[names != ''].groupby(names)['valuation_num'].sum()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for n_rows in parse_rows(args.rows):
+        df = generate(n_rows)[['Company', 'Valuation', 'Select Investors']]
+        df['valuation_num'] = parse_money(df['Valuation'])
+        seconds, graph = best_of(lambda: InvestorGraph(df), 1)
+        print(f"--- {n_rows:,} rows, {graph.n_edges:,} edges, {len(graph.investors):,} investors")
+        report("build InvestorGraph", seconds, n_rows)
+
+        seconds, expected = best_of(lambda: scan_portfolio(df, INVESTOR), 1)
+        report("portfolio: split + scan", seconds, n_rows)
+        seconds, rows = best_of(lambda: graph.portfolio(INVESTOR), args.repeat)
+        report("portfolio: InvestorGraph", seconds, n_rows)
+        assert np.array_equal(rows, expected)
+
+        seconds, expected = best_of(lambda: scan_total_valuation(df), 1)
+        report("valuation per investor: explode + groupby", seconds, n_rows)
+        seconds, totals = best_of(graph.total_valuation, args.repeat)
+        report("valuation per investor: InvestorGraph", seconds, n_rows)
+        pd.testing.assert_series_equal(totals.sort_index(), expected.sort_index(),
+                                       check_names=False, check_index_type=False)
+
+        seconds, shared = best_of(lambda: graph.co_investors(INVESTOR), args.repeat)
+        report("co-investors", seconds, n_rows)
+        seconds, pairs = best_of(graph.co_investment_pairs, 1)
+        report(f"co-investment pairs ({len(pairs):,})", seconds, n_rows)
+        top = pairs.iloc[0]
+        assert graph.co_investors(top['investor_a'])[top['investor_b']] == top['companies']
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Benchmark the lazy query layer against the activity's eager steps.
+
+Each mode runs in a fresh subprocess so its peak RSS can be compared. Both
+modes compute ``count_total``, ``count_dropna_rows``, the row count after
+``dropna(subset=['City', 'Select Investors'])`` and the hardware-companies
+filter.
+
+Usage:
+
+    python bench_lazy.py --rows 100K,1M
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchutil import parse_rows, peak_rss_mib, write_scaled_csv
+from lazy import col, run_together, scan_csv
+from loader import load_companies
+
+CITIES = ['Beijing', 'San Francisco', 'London']
+
+
+def eager(path):
+    df_companies = load_companies(path)
+    count_total = df_companies.count()
+    count_dropna_rows = df_companies.dropna().count()
+    count_dropna_columns = len(df_companies.dropna(subset=['City', 'Select Investors']))
+    df_invest = df_companies[(df_companies['Industry'] == 'Hardware') & df_companies['City'].isin(CITIES)]
+    return count_total, count_dropna_rows, count_dropna_columns, len(df_invest)
+
+
+def lazy(path):
+    companies = scan_csv(path)
+    count_total, count_dropna_rows, count_dropna_columns, df_invest = run_together(
+        (companies, 'count'),
+        (companies.dropna(), 'count'),
+        (companies.dropna(subset=['City', 'Select Investors']), 'count_rows'),
+        (companies.filter((col('Industry') == 'Hardware') & col('City').isin(CITIES)), 'collect'),
+    )
+    return count_total, count_dropna_rows, count_dropna_columns, len(df_invest)
+
+
+MODES = {'eager': eager, 'lazy': lazy}
+
+
+def worker(mode, path):
+    start = time.perf_counter()
+    results = MODES[mode](path)
+    seconds = time.perf_counter() - start
+    print(f"{seconds} {peak_rss_mib()} {int(results[1].sum())} {results[2]} {results[3]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100K,1M", help="comma-separated row counts")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    print(f"{'rows':>12} {'mode':<6} {'time s':>8} {'peak RSS MiB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in parse_rows(args.rows):
+            path = write_scaled_csv(os.path.join(tmp, f"companies_{n_rows}.csv"), n_rows)
+            checks = set()
+            for mode in MODES:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()
+                checks.add(tuple(out[2:]))
+                print(f"{n_rows:>12,} {mode:<6} {float(out[0]):>8.2f} {float(out[1]):>13.1f}")
+            assert len(checks) == 1, f"eager and lazy results differ: {checks}"
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
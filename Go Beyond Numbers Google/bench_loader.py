@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Benchmark the typed loader against the activity's bare ``read_csv`` + cleaning.
+
+Reports load time and deep memory per row for the full table and for each
+pruned analysis in ``loader.ANALYSES``.
+
+Usage:
+
+    python bench_loader.py --rows 10K,1M
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchutil import best_of, parse_rows, write_scaled_csv
+from loader import ANALYSES, load_companies, memory_per_row
+
+
+def load_eager(path):
+    # The activity's loading and cleaning steps, as written in the script.
+    df = pd.read_csv(path)
+    df['Date Joined'] = pd.to_datetime(df['Date Joined'], format='%m/%d/%y')
+    df['Year Joined'] = df['Date Joined'].dt.year
+    df['valuation_num'] = df['Valuation'].apply(lambda x: int(x.strip('$B')))
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in parse_rows(args.rows):
+            path = write_scaled_csv(os.path.join(tmp, f"companies_{n_rows}.csv"), n_rows)
+            print(f"--- {n_rows:,} rows ({os.path.getsize(path) / 2**20:.1f} MiB)")
+            print(f"{'loader':<50} {'time':>10} {'bytes/row':>12}")
+
+            seconds, df = best_of(lambda: load_eager(path), args.repeat)
+            print(f"{'read_csv + apply (activity)':<50} {seconds * 1e3:8.1f} ms {memory_per_row(df):12.1f}")
+            seconds, df = best_of(lambda: load_companies(path), args.repeat)
+            print(f"{'load_companies()':<50} {seconds * 1e3:8.1f} ms {memory_per_row(df):12.1f}")
+            for analysis in ANALYSES:
+                seconds, df = best_of(lambda: load_companies(path, analysis=analysis), args.repeat)
+                label = f"load_companies(analysis={analysis!r})"
+                print(f"{label:<50} {seconds * 1e3:8.1f} ms {memory_per_row(df):12.1f}")
+
+
+if __name__ == "__main__":
+    main()
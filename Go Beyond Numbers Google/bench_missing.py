@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Benchmark ``missing.profile_frame`` against the activity's isna/get_dummies counting.
+
+Usage:
+
+    python bench_missing.py --rows 10M
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchutil import best_of, load_sample, parse_rows, peak_rss_mib, report, scale_frame
+from missing import profile_chunks, profile_frame
+
+
+def activity(df):
+    df_na = df.isna()
+    dummies = pd.get_dummies(df_na, dummy_na=True).sum()
+    mask = df.isna().any(axis=1)
+    return dummies, mask
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10M", help="comma-separated row counts")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    sample = load_sample()
+    for n_rows in parse_rows(args.rows):
+        df = scale_frame(sample, n_rows)
+        print(f"--- {n_rows:,} rows x {df.shape[1]} columns")
+
+        seconds, (_, expected_mask) = best_of(lambda: activity(df), args.repeat)
+        report("isna + get_dummies + any(axis=1)", seconds, n_rows)
+        seconds, profile = best_of(lambda: profile_frame(df), args.repeat)
+        report("profile_frame", seconds, n_rows)
+        assert (profile.null_counts() == df.isna().sum()).all()
+        assert np.array_equal(profile.any_missing(), expected_mask.to_numpy())
+
+        chunks = lambda: (df.iloc[start:start + args.chunksize] for start in range(0, n_rows, args.chunksize))
+        seconds, chunked = best_of(lambda: profile_chunks(chunks()), args.repeat)
+        report(f"profile_chunks ({args.chunksize:,} rows/chunk)", seconds, n_rows)
+        assert chunked.rows_with_missing() == profile.rows_with_missing()
+        print(f"peak RSS so far: {peak_rss_mib():.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
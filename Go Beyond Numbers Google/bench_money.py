@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Benchmark ``money.parse_money`` against the activity's ``apply(str_to_num)``.
+
+Usage:
+
+    python bench_money.py --rows 10K,1M,10M
+"""
+
+import argparse
+
+import numpy as np
+
+from benchutil import best_of, load_sample, parse_rows, report, scale_frame
+from money import parse_money
+
+
+def str_to_num(x):
+    x = x.strip('$B')
+    return int(x)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M,10M", help="comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sample = load_sample()
+    for n_rows in parse_rows(args.rows):
+        scaled = scale_frame(sample[['Valuation', 'Funding']], n_rows)
+        valuations, funding = scaled['Valuation'], scaled['Funding']
+        print(f"--- {n_rows:,} rows")
+
+        seconds, expected = best_of(lambda: valuations.apply(str_to_num), args.repeat)
+        report("Valuation apply(str_to_num)", seconds, n_rows)
+        seconds, parsed = best_of(lambda: parse_money(valuations), args.repeat)
+        report("Valuation parse_money", seconds, n_rows)
+        assert np.array_equal(parsed, expected.to_numpy(dtype=np.float64))
+
+        seconds, _ = best_of(lambda: parse_money(funding), args.repeat)
+        report("Funding parse_money ($M/$B/Unknown)", seconds, n_rows)
+
+
+if __name__ == "__main__":
+    main()
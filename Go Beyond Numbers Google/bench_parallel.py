@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Benchmark ``parallel.ParallelEngine`` scaling with the number of workers.
+
+The sample table is scaled up to ``--rows`` rows and every reduction is run
+with 1, 2, 4, ... workers up to ``--workers``. Results are checked to be
+bit-for-bit identical to the single-worker run and to the serial pandas
+reductions.
+
+Usage:
+
+    python bench_parallel.py --rows 50M --workers 16
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchutil import best_of, parse_rows, scale_frame
+from loader import load_companies
+from parallel import ParallelEngine
+
+CITIES = ['Beijing', 'San Francisco', 'London']
+
+COLUMNS = ['Industry', 'City', 'Country/Region', 'Continent', 'Year Founded',
+           'Select Investors', 'valuation_num', 'funding_num']
+
+
+def run_all(engine):
+    return (
+        engine.group_sum('Country/Region', 'valuation_num'),
+        engine.group_sum('Industry', 'funding_num'),
+        engine.isin('City', CITIES),
+        engine.null_counts(),
+    )
+
+
+def identical(left, right):
+    for a, b in zip(left, right):
+        if isinstance(a, pd.Series):
+            a, b = a.to_numpy(), b.to_numpy()
+        if a.tobytes() != b.tobytes():
+            return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10M", help="table size, e.g. 10M or 50M")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    n_rows = parse_rows(args.rows)[0]
+    df = scale_frame(load_companies()[COLUMNS], n_rows)
+    print(f"{n_rows:,} rows, {os.cpu_count()} CPUs")
+
+    counts = [1]
+    while counts[-1] * 2 <= args.workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.workers:
+        counts.append(args.workers)
+
+    baseline_seconds = baseline = None
+    print(f"{'workers':>8} {'time ms':>10} {'speedup':>8} {'identical':>10}")
+    for workers in counts:
+        with ParallelEngine(df, workers=workers) as engine:
+            seconds, results = best_of(lambda: run_all(engine), args.repeat)
+        if baseline is None:
+            baseline_seconds, baseline = seconds, results
+        same = identical(results, baseline)
+        print(f"{workers:>8} {seconds * 1e3:>10.1f} {baseline_seconds / seconds:>8.2f} {str(same):>10}")
+        assert same, f"results with {workers} workers differ from the serial run"
+
+    for result, (by, value) in zip(baseline, [('Country/Region', 'valuation_num'), ('Industry', 'funding_num')]):
+        expected = df.groupby(by, observed=True)[value].sum()
+        assert result.index.tolist() == expected.index.tolist()
+        assert result.to_numpy().tobytes() == expected.to_numpy().tobytes(), f"{value} sums differ from pandas"
+    assert np.array_equal(baseline[2], df['City'].isin(CITIES).to_numpy())
+    assert baseline[3].equals(df.isna().sum().astype(np.int64))
+
+
+if __name__ == "__main__":
+    main()
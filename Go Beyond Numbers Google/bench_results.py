@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark a recurring mix of report questions with and without ``results.ResultCache``.
+
+The workload asks the report's questions (top countries, city filters, AI
+companies in London, companies that joined after 2020) with a few parameter
+variants each, ``--rounds`` times over; the first round fills the cache.
+
+Usage:
+
+    python bench_results.py --rows 10K,1M --rounds 5
+"""
+
+import argparse
+import tempfile
+
+from benchutil import best_of, parse_rows, report
+from filter_index import FilterIndex
+from loader import SCHEMA, clean_companies
+from results import ResultCache
+from synth import generate
+from topn import BIG_FOUR, top_n
+
+QUESTIONS = [
+    ('top_n', {'n': 10, 'exclude': []}),
+    ('top_n', {'n': 20, 'exclude': sorted(BIG_FOUR)}),
+    ('rows', {'Industry': 'Hardware', 'City': ['Beijing', 'San Francisco', 'London']}),
+    ('rows', {'Industry': ['Artificial intelligence', 'Artificial Intelligence'], 'City': 'London'}),
+    ('rows', {'City': 'Berlin'}),
+    ('joined_after', {'year': 2020}),
+    ('joined_after', {'year': 2015}),
+]
+
+
+def answer(df, index, operation, params):
+    if operation == 'top_n':
+        totals = df.groupby('Country/Region', observed=True)['valuation_num'].sum()
+        return top_n(totals, params['n'], exclude=params['exclude'])
+    if operation == 'rows':
+        return df.iloc[index.rows(params)]
+    return df[df['Year Joined'] > params['year']]
+
+
+def workload(df, index, rounds, results=None, version='bench'):
+    for _ in range(rounds):
+        for operation, params in QUESTIONS:
+            if results is None:
+                answer(df, index, operation, params)
+            else:
+                results.get_or_compute(version, operation, params, lambda: answer(df, index, operation, params))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M", help="comma-separated row counts")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    n_questions = args.rounds * len(QUESTIONS)
+    for n_rows in parse_rows(args.rows):
+        df = clean_companies(generate(n_rows).astype(SCHEMA))
+        index = FilterIndex(df, columns=['Industry', 'City'])
+        print(f"--- {n_rows:,} rows, {n_questions} questions")
+        seconds, _ = best_of(lambda: workload(df, index, args.rounds), args.repeat)
+        report("recompute every question", seconds, n_rows)
+
+        def cached():
+            results = ResultCache()
+            workload(df, index, args.rounds, results)
+            return results
+
+        seconds, results = best_of(cached, args.repeat)
+        report("memory LRU", seconds, n_rows)
+        print(f"{'':<40} {results.stats()}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            workload(df, index, 1, ResultCache(cache_dir=tmp))
+            seconds, _ = best_of(lambda: workload(df, index, 1, ResultCache(cache_dir=tmp)), 1)
+            report("new process, disk tier (1 round)", seconds, n_rows)
+
+
+if __name__ == "__main__":
+    main()
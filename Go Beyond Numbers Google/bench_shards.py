@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Benchmark loading many CSV shards one by one vs with ``shards.load_shards``.
+
+The shards are synthetic tables written to a temporary directory.
+
+Usage:
+
+    python bench_shards.py --shards 200 --rows 5K --concurrency 1,4,16
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchutil import best_of, parse_rows, report
+from loader import load_companies
+from shards import load_shards, shard_paths
+from synth import fit_profile, generate
+
+
+def sequential(paths):
+    return pd.concat([load_companies(path) for path in paths], ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, default=200)
+    parser.add_argument("--rows", default="5K", help="rows per shard")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated max_concurrency values")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rows_per_shard = parse_rows(args.rows)[0]
+    profile = fit_profile(pd.read_csv("Unicorn_Companies.csv"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for shard in range(args.shards):
+            generate(rows_per_shard, seed=[0, shard], profile=profile, start=shard * rows_per_shard).to_csv(
+                os.path.join(tmp, f"shard-{shard:04d}.csv"), index=False)
+        paths = shard_paths(os.path.join(tmp, "shard-*.csv"))
+        n_rows = args.shards * rows_per_shard
+        print(f"--- {args.shards} shards x {rows_per_shard:,} rows")
+
+        seconds, expected = best_of(lambda: sequential(paths), args.repeat)
+        report("load_companies per shard + concat", seconds, n_rows)
+        print(f"{'':<40} dtypes: {sorted(set(map(str, expected.dtypes)))}")
+        for concurrency in parse_rows(args.concurrency):
+            seconds, df = best_of(lambda: load_shards(paths, max_concurrency=concurrency), args.repeat)
+            report(f"load_shards (max_concurrency={concurrency})", seconds, n_rows)
+        print(f"{'':<40} dtypes: {sorted(set(map(str, df.dtypes)))}")
+        pd.testing.assert_series_equal(df['valuation_num'], expected['valuation_num'])
+        assert (df['City'].astype(object).fillna('') == expected['City'].astype(object).fillna('')).all()
+
+
+if __name__ == "__main__":
+    main()
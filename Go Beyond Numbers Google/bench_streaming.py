@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Benchmark peak RSS of the in-memory vs streaming national valuation aggregation.
+
+Each measurement runs in a fresh subprocess so its peak resident set size
+reflects only that aggregation. Each worker saves its result, and the
+streaming totals are checked to equal the in-memory ones.
+
+Usage:
+
+    python bench_streaming.py --rows 100K,1M,5M
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchutil import parse_rows, peak_rss_mib, write_scaled_csv
+from money import parse_money
+import streaming
+
+
+def in_memory(path):
+    df = pd.read_csv(path)
+    df['valuation_num'] = parse_money(df['Valuation'])
+    return df.groupby('Country/Region')['valuation_num'].sum()
+
+
+MODES = {
+    'in-memory': in_memory,
+    'streaming': streaming.national_valuations,
+}
+
+
+def result_path(path, mode):
+    return f"{path}.{mode}.pkl"
+
+
+def worker(mode, path):
+    start = time.perf_counter()
+    result = MODES[mode](path)
+    seconds = time.perf_counter() - start
+    print(f"{seconds} {peak_rss_mib()}")
+    result.to_pickle(result_path(path, mode))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100K,1M,5M", help="comma-separated row counts")
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    print(f"{'rows':>12} {'file MiB':>10} {'mode':<10} {'time s':>8} {'peak RSS MiB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in parse_rows(args.rows):
+            path = write_scaled_csv(os.path.join(tmp, f"companies_{n_rows}.csv"), n_rows)
+            size_mib = os.path.getsize(path) / 2**20
+            for mode in MODES:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()
+                seconds, peak_mib = float(out[0]), float(out[1])
+                print(f"{n_rows:>12,} {size_mib:>10.1f} {mode:<10} {seconds:>8.2f} {peak_mib:>13.1f}")
+            results = {mode: pd.read_pickle(result_path(path, mode)) for mode in MODES}
+            pd.testing.assert_series_equal(results['streaming'], results['in-memory'])
+            for mode in MODES:
+                os.remove(result_path(path, mode))
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""Benchmark every step of the activity on synthetic tables of increasing size.
+
+For each size a synthetic CSV is generated with ``synth.py`` (kept in
+``--data-dir`` and reused by later runs) and the steps below run in a fresh
+subprocess, so each size's peak memory is its own. Each step reads only the
+columns it needs, as the report does:
+
+* ``missing/profile``: null counts and rows with missing values, streamed
+  in chunks (``missing.profile_chunks``);
+* ``missing/impute``: City / Country/Region imputation of those rows;
+* ``filters/*``: typed load, filter index, hardware and AI-in-London filters;
+* ``national/*``: valuation parsing, country totals and top 20;
+* ``maps/*``: date parsing, the map cube and the three report maps;
+* ``charts/summarize``: per-continent summary with a bootstrap interval.
+
+Step timings are printed per size and written as ``stages.py`` traces
+(``suite_<rows>.json``) to ``--out``; ``--baseline DIR`` compares them with
+the traces of an earlier run.
+
+Usage:
+
+    python bench_suite.py --rows 10K,1M,50M --out suite
+    python bench_suite.py --rows 10K,1M --out suite_new --baseline suite
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from benchutil import parse_rows, peak_rss_mib
+from chart_data import summarize
+from filter_index import FilterIndex
+from impute import impute
+from loader import load_companies, read_companies_csv
+from maps import MAP_SPECS, country_cube, map_aggregates, valuation_map
+from missing import profile_chunks
+from stages import Tracer, compare, load_trace
+from synth import write_synthetic_csv
+from topn import BIG_FOUR, top_n
+
+CHUNKSIZE = 1_000_000
+
+HARDWARE_CITIES = ['Beijing', 'San Francisco', 'London']
+AI_INDUSTRY = ['Artificial intelligence', 'Artificial Intelligence']
+
+
+def synthetic_csv(data_dir, n_rows, seed=0):
+    """Return the path of the synthetic table of ``n_rows`` rows, generating it if needed."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{n_rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        write_synthetic_csv(path, n_rows, seed=seed)
+    return path
+
+
+def run_steps(path, tracer, chunksize=CHUNKSIZE):
+    """Run the activity's steps on the CSV at ``path``, one ``tracer`` stage each."""
+    with tracer.stage("missing"):
+        with tracer.stage("profile") as stage:
+            chunks = read_companies_csv(path, chunksize=chunksize)
+            profile = profile_chunks(chunks, keep_rows=True)
+            missing_rows = profile.any_missing().nonzero()[0]
+            stage.rows_in, stage.rows_out = profile.n_rows, len(missing_rows)
+        with tracer.stage("impute") as stage:
+            locations = load_companies(path, columns=['City', 'Country/Region'])
+            _, report = impute(locations.iloc[missing_rows], reference=locations)
+            stage.rows_in, stage.rows_out = len(missing_rows), int(report['filled'].sum())
+            del locations
+
+    with tracer.stage("filters"):
+        with tracer.stage("load") as stage:
+            df = load_companies(path, analysis='investor_filters', tracer=tracer)
+            stage.rows_out = len(df)
+        with tracer.stage("index", rows_in=len(df)):
+            index = FilterIndex(df)
+        with tracer.stage("query", rows_in=len(df)) as stage:
+            hardware = df.iloc[index.rows({'Industry': 'Hardware', 'City': HARDWARE_CITIES})]
+            ai_london = df.iloc[index.rows({'Industry': AI_INDUSTRY, 'City': 'London'})]
+            stage.rows_out = len(hardware) + len(ai_london)
+        del df, index
+
+    with tracer.stage("national"):
+        with tracer.stage("load") as stage:
+            df = load_companies(path, analysis='national_valuations', tracer=tracer)
+            stage.rows_out = len(df)
+        with tracer.stage("top20", rows_in=len(df)) as stage:
+            totals = df.groupby('Country/Region', observed=True)['valuation_num'].sum()
+            stage.rows_out = len(top_n(totals, 20, exclude=BIG_FOUR))
+        del df
+
+    with tracer.stage("maps"):
+        with tracer.stage("load") as stage:
+            df = load_companies(path, analysis='valuation_maps', tracer=tracer)
+            stage.rows_out = len(df)
+        with tracer.stage("cube", rows_in=len(df)) as stage:
+            cube = country_cube(df)
+            stage.rows_out = len(cube)
+        with tracer.stage("figures", rows_in=len(cube)) as stage:
+            figures = [valuation_map(map_aggregates(cube, spec), spec.title).to_json()
+                       for spec in MAP_SPECS.values()]
+            stage.rows_out = len(figures)
+
+    with tracer.stage("charts"):
+        with tracer.stage("summarize", rows_in=len(df)) as stage:
+            stage.rows_out = len(summarize(df, 'Continent', ci=95))
+        del df
+
+
+def worker(path, trace_path, chunksize, trace_memory=False):
+    tracer = Tracer(trace_memory=trace_memory, source=os.path.basename(path))
+    with tracer.stage("total"):
+        run_steps(path, tracer, chunksize)
+    tracer.metadata['peak_rss_mib'] = peak_rss_mib()
+    tracer.to_json(trace_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10K,1M,50M", help="comma-separated row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(".cache", "synthetic"),
+                        help="where the synthetic tables are kept (default: %(default)s)")
+    parser.add_argument("--out", default="suite", help="directory for the traces (default: %(default)s)")
+    parser.add_argument("--baseline", help="directory with the traces of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also trace allocations with tracemalloc (slows the stages down)")
+    parser.add_argument("--worker", nargs=2, metavar=("CSV", "TRACE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(*args.worker, args.chunksize, args.trace_memory)
+        return 0
+
+    os.makedirs(args.out, exist_ok=True)
+    regressed = False
+    for n_rows in parse_rows(args.rows):
+        path = synthetic_csv(args.data_dir, n_rows, args.seed)
+        trace_path = os.path.join(args.out, f"suite_{n_rows}.json")
+        subprocess.run([sys.executable, __file__, "--worker", path, trace_path, "--chunksize", str(args.chunksize)]
+                       + (["--trace-memory"] if args.trace_memory else []), check=True)
+        trace = load_trace(trace_path)
+        stages = pd.DataFrame(trace['stages']).set_index('name')
+        print(f"--- {n_rows:,} rows ({os.path.getsize(path) / 2**20:,.0f} MiB CSV, "
+              f"peak RSS {trace['metadata']['peak_rss_mib']:,.0f} MiB)")
+        table = pd.DataFrame({
+            'wall ms': (stages['wall_seconds'] * 1e3).round(1),
+            'M rows/s': (stages['rows_in'] / stages['wall_seconds'] / 1e6).round(2),
+            'rss+ MiB': (stages['peak_rss_growth_bytes'] / 2**20).round(1),
+        })
+        if args.trace_memory:
+            table['peak MiB'] = (stages['peak_memory_bytes'].astype(float) / 2**20).round(1)
+        print(table.fillna('').to_string())
+        baseline = args.baseline and os.path.join(args.baseline, f"suite_{n_rows}.json")
+        if baseline and os.path.exists(baseline):
+            for name, old, new, ratio in compare(load_trace(baseline), trace, args.threshold):
+                regressed = True
+                print(f"REGRESSION {name}: {old * 1e3:.1f} ms -> {new * 1e3:.1f} ms ({ratio:.2f}x)")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
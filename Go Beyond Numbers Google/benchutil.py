@@ -0,0 +1,75 @@
+"""Small helpers shared by the ``bench_*.py`` scripts."""
+
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_CSV = "Unicorn_Companies.csv"
+
+
+def scale_frame(df, n_rows):
+    """Return ``df`` repeated (and truncated) to exactly ``n_rows`` rows."""
+    positions = np.arange(n_rows) % len(df)
+    return df.iloc[positions].reset_index(drop=True)
+
+
+def write_scaled_csv(path, n_rows, source=SAMPLE_CSV):
+    """Write the sample CSV scaled to ``n_rows`` rows to ``path`` and return ``path``."""
+    scale_frame(pd.read_csv(source), n_rows).to_csv(path, index=False)
+    return path
+
+
+def peak_rss_mib():
+    """Return this process's peak RSS in MiB.
+
+    On Linux ``ru_maxrss`` survives ``exec`` and would include the parent's
+    peak, so the per-process high-water mark from ``/proc`` is used instead.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def best_of(func, repeat=3):
+    """Run ``func`` ``repeat`` times and return (best wall time in seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, seconds, n_rows):
+    """Print one benchmark line with wall time and row throughput."""
+    rate = n_rows / seconds if seconds else float("inf")
+    print(f"{label:<40} {seconds * 1e3:10.1f} ms {rate / 1e6:10.2f} M rows/s")
+
+
+def parse_rows(text):
+    """Parse a comma-separated list of row counts such as ``10K,1M,10M``."""
+    factors = {"K": 10**3, "M": 10**6, "B": 10**9}
+    counts = []
+    for item in text.split(","):
+        item = item.strip().upper()
+        if item[-1:] in factors:
+            counts.append(int(float(item[:-1]) * factors[item[-1]]))
+        else:
+            counts.append(int(item))
+    return counts
+
+
+def load_sample(path=SAMPLE_CSV):
+    """Read the sample CSV the way the activity does."""
+    return pd.read_csv(path)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+"""Memory-mapped, fixed-width binary store of the cleaned companies table.
+
+Every process that loads the table, from the CSV or from the Parquet cache,
+decodes its own private copy. A store is a directory of raw column files
+that ``numpy.memmap`` opens without parsing, so concurrent report workers
+share the pages through the OS page cache:
+
+* numeric and datetime columns: one fixed-width array file each
+  (``<column>.values``), plus a validity bitmap (``<column>.valid``) for
+  nullable columns such as ``Year Joined``;
+* categorical columns: int32 codes (``<column>.codes``, -1 for missing)
+  plus their categories in the manifest;
+* string columns (``Company``, ``Select Investors``): int64 offsets
+  (``<column>.offsets``), the UTF-8 bytes (``<column>.data``) and a
+  validity bitmap (``<column>.valid``), the layout of an Arrow
+  ``large_string`` array, which is wrapped around the mapped files without
+  copying;
+* ``manifest.json``: row count and each column's kind, dtype and
+  categories (with their dtype).
+
+A store is written to a temporary directory and renamed into place, so
+readers never see a half-written store. Requires ``pyarrow`` for the string
+columns.
+
+Example:
+
+    write_store(load_companies(), 'companies.store')
+    store = BinaryStore('companies.store')
+    store.codes('Country/Region')                 # memmap of int32 codes
+    store.frame(['Company', 'valuation_num'])     # DataFrame over the mapped files
+
+Running the module writes the store for ``Unicorn_Companies.csv`` and checks
+that it reads back equal to ``load_companies()``:
+
+    python binstore.py --store .cache/companies.store
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from loader import COMPANIES_CSV, load_companies
+from table_cache import CACHE_DIR
+
+STORE_VERSION = 1
+MANIFEST = "manifest.json"
+
+NUMERIC = 'numeric'
+CATEGORICAL = 'categorical'
+STRING = 'string'
+
+
+def _file_name(column, part):
+    """File name for ``part`` of ``column``; '/' in column names is not allowed in file names."""
+    return f"{column.replace('/', '_')}.{part}"
+
+
+def _column_kind(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return CATEGORICAL
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+        return NUMERIC
+    return STRING
+
+
+def _is_masked(series):
+    """True for pandas' nullable numeric dtypes (``Int16``, ``Float64``, ...)."""
+    return isinstance(series.array, (pd.arrays.IntegerArray, pd.arrays.FloatingArray))
+
+
+def _write_string_column(series, directory, column):
+    array = pa.array(series, type=pa.large_string(), from_pandas=True)
+    # Concatenated frames give a chunked array, and sliced ones an array whose
+    # buffers start before its first value: write one chunk, rebased to 0.
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(0, dtype=np.uint8)
+    (offsets - offsets[0]).tofile(os.path.join(directory, _file_name(column, 'offsets')))
+    data[offsets[0]:offsets[-1]].tofile(os.path.join(directory, _file_name(column, 'data')))
+    valid = np.packbits(series.notna().to_numpy(), bitorder='little')
+    valid.tofile(os.path.join(directory, _file_name(column, 'valid')))
+    return {'null_count': int(series.isna().sum())}
+
+
+def write_store(df, path):
+    """Write ``df`` (a cleaned companies table) as a binary store at ``path`` and return ``path``.
+
+    An existing store at ``path`` is replaced.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    columns = []
+    for column in df.columns:
+        series = df[column]
+        entry = {'name': column, 'kind': _column_kind(series)}
+        if entry['kind'] == NUMERIC and _is_masked(series):
+            entry['dtype'] = series.dtype.numpy_dtype.str
+            entry['nullable'] = str(series.dtype)
+            series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0).tofile(
+                os.path.join(tmp_path, _file_name(column, 'values')))
+            np.packbits(series.notna().to_numpy(), bitorder='little').tofile(
+                os.path.join(tmp_path, _file_name(column, 'valid')))
+        elif entry['kind'] == NUMERIC:
+            values = series.to_numpy()
+            entry['dtype'] = values.dtype.str
+            values.tofile(os.path.join(tmp_path, _file_name(column, 'values')))
+        elif entry['kind'] == CATEGORICAL:
+            entry['categories'] = series.cat.categories.tolist()
+            entry['categories_dtype'] = str(series.cat.categories.dtype)
+            series.cat.codes.to_numpy().astype(np.int32).tofile(os.path.join(tmp_path, _file_name(column, 'codes')))
+        else:
+            entry.update(_write_string_column(series, tmp_path, column))
+        columns.append(entry)
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as f:
+        json.dump({'version': STORE_VERSION, 'n_rows': len(df), 'columns': columns}, f, indent=1)
+
+    old_path = f"{path}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+class BinaryStore:
+    """Read-only view of a store written by ``write_store``; columns are mapped on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest['version'] != STORE_VERSION:
+            raise ValueError(f"{path}: store version {manifest['version']}, expected {STORE_VERSION}")
+        self.n_rows = manifest['n_rows']
+        self.entries = {entry['name']: entry for entry in manifest['columns']}
+        self.columns = list(self.entries)
+        self._maps = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def _map(self, column, part, dtype, length):
+        key = (column, part)
+        if key not in self._maps:
+            file_path = os.path.join(self.path, _file_name(column, part))
+            # ``np.memmap`` cannot map an empty file.
+            if length == 0 or os.path.getsize(file_path) == 0:
+                self._maps[key] = np.zeros(0, dtype=dtype)
+            else:
+                self._maps[key] = np.memmap(file_path, dtype=dtype, mode='r', shape=(length,))
+        return self._maps[key]
+
+    def _entry(self, column):
+        try:
+            return self.entries[column]
+        except KeyError:
+            raise KeyError(f"{column!r} is not in the store; columns are {self.columns}") from None
+
+    def values(self, column):
+        """Read-only memmap of a numeric or datetime column (0 where a nullable column is missing)."""
+        entry = self._entry(column)
+        if entry['kind'] != NUMERIC:
+            raise TypeError(f"{column!r} is a {entry['kind']} column")
+        return self._map(column, 'values', np.dtype(entry['dtype']), self.n_rows)
+
+    def codes(self, column):
+        """Read-only memmap of a categorical column's int32 codes (-1 for missing)."""
+        entry = self._entry(column)
+        if entry['kind'] != CATEGORICAL:
+            raise TypeError(f"{column!r} is a {entry['kind']} column")
+        return self._map(column, 'codes', np.int32, self.n_rows)
+
+    def strings(self, column):
+        """Arrow ``large_string`` array over the mapped offsets, bytes and validity files."""
+        entry = self._entry(column)
+        if entry['kind'] != STRING:
+            raise TypeError(f"{column!r} is a {entry['kind']} column")
+        offsets = self._map(column, 'offsets', np.int64, self.n_rows + 1)
+        if not len(offsets):
+            offsets = np.zeros(1, dtype=np.int64)
+        data = self._map(column, 'data', np.uint8, int(offsets[-1]))
+        valid = self._map(column, 'valid', np.uint8, (self.n_rows + 7) // 8)
+        return pa.LargeStringArray.from_buffers(self.n_rows, pa.py_buffer(offsets), pa.py_buffer(data),
+                                                pa.py_buffer(valid), entry['null_count'])
+
+    def column(self, column):
+        """Return ``column`` as a Series; numeric and string columns wrap the mapped files."""
+        entry = self._entry(column)
+        if entry['kind'] == NUMERIC and 'nullable' in entry:
+            valid = self._map(column, 'valid', np.uint8, (self.n_rows + 7) // 8)
+            missing = np.unpackbits(valid, count=self.n_rows, bitorder='little') == 0
+            array_type = pd.api.types.pandas_dtype(entry['nullable']).construct_array_type()
+            series = pd.Series(array_type(self.values(column), missing), copy=False)
+        elif entry['kind'] == NUMERIC:
+            series = pd.Series(self.values(column), copy=False)
+        elif entry['kind'] == CATEGORICAL:
+            categories = pd.Index(entry['categories'], dtype=entry.get('categories_dtype'))
+            series = pd.Series(pd.Categorical.from_codes(self.codes(column), categories=categories))
+        else:
+            series = self.strings(column).to_pandas()
+        return series.rename(column)
+
+    def frame(self, columns=None):
+        """Return ``columns`` (default: all, in stored order) as a DataFrame."""
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame({column: self.column(column) for column in columns})
+
+
+def verify(df, path):
+    """Raise ``AssertionError`` unless the store at ``path`` reads back equal to ``df``."""
+    stored = BinaryStore(path).frame()
+    expected = df.reset_index(drop=True)
+    assert list(stored.columns) == list(expected.columns), (list(stored.columns), list(expected.columns))
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=True, check_categorical=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the binary store and check the round trip.")
+    parser.add_argument("--source", default=COMPANIES_CSV)
+    parser.add_argument("--store", default=os.path.join(CACHE_DIR, "companies.store"))
+    args = parser.parse_args(argv)
+
+    df_companies = load_companies(args.source)
+    write_store(df_companies, args.store)
+    verify(df_companies, args.store)
+    size = sum(os.path.getsize(os.path.join(args.store, name)) for name in os.listdir(args.store))
+    print(f"{args.store}: {len(df_companies):,} rows, {len(df_companies.columns)} columns, "
+          f"{size / 2**20:.1f} MiB; round trip OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
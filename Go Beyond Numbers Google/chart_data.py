@@ -0,0 +1,100 @@
+"""Pre-aggregated, binned chart data for plotting large company sets.
+
+``sns.barplot`` groups the raw rows itself and bootstraps a confidence
+interval by resampling every group 1,000 times, which is slow on the full
+production table. ``summarize`` reduces the rows to one line per bar first
+(sum, mean, count and, optionally, a bootstrap confidence interval of the
+mean computed with vectorized NumPy resampling), and ``barplot_summary``
+draws those few lines with precomputed error bars.
+
+Example:
+
+    summary = summarize(df_companies, 'Continent', ci=95)
+    barplot_summary(summary, 'Continent', 'mean')
+"""
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib import pyplot as plt
+
+STATS = ('sum', 'mean', 'count')
+
+# Rows per group that the bootstrap resamples; larger groups are subsampled
+# first so the resampling cost does not grow with the table.
+BOOTSTRAP_ROWS = 5_000
+N_BOOT = 1_000
+
+
+def year_bins(years, width=5):
+    """Bin integer years into ``width``-year labels such as ``2010-2014``.
+
+    Returns an ordered categorical Series with the index and name of ``years``.
+    """
+    years = pd.Series(years)
+    starts = (years // width) * width
+    labels = starts.astype('Int64').astype(str) + '-' + (starts + width - 1).astype('Int64').astype(str)
+    labels = labels.where(years.notna())
+    order = sorted(labels.dropna().unique(), key=lambda label: int(label.split('-')[0]))
+    return pd.Series(pd.Categorical(labels, categories=order, ordered=True),
+                     index=years.index, name=years.name)
+
+
+def bootstrap_mean_ci(values, ci=95, n_boot=N_BOOT, max_rows=BOOTSTRAP_ROWS, rng=None):
+    """Percentile bootstrap interval of the mean of ``values``.
+
+    All ``n_boot`` resamples are drawn as one ``(n_boot, n)`` index matrix.
+    Groups with more than ``max_rows`` values are first subsampled without
+    replacement. Returns ``(low, high)``; NaN for empty input.
+    """
+    rng = np.random.default_rng(rng)
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.nan, np.nan
+    if len(values) > max_rows:
+        values = rng.choice(values, max_rows, replace=False)
+    samples = values[rng.integers(0, len(values), size=(n_boot, len(values)))]
+    means = samples.mean(axis=1)
+    tail = (100 - ci) / 2
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return low, high
+
+
+def summarize(df, by, value='valuation_num', stats=STATS, ci=None, n_boot=N_BOOT, seed=0):
+    """Return one row per value of ``by`` with ``stats`` of ``value``.
+
+    ``by`` is a column name or a Series aligned with ``df`` (e.g. from
+    ``year_bins``). With ``ci`` (e.g. 95) the frame also has ``ci_low`` and
+    ``ci_high`` columns holding a bootstrap interval of the mean.
+    """
+    keys = df[by] if isinstance(by, str) else pd.Series(by, index=df.index)
+    name = by if isinstance(by, str) else (keys.name or 'group')
+    grouped = df[value].groupby(keys, observed=True, sort=True)
+    summary = grouped.agg(list(stats))
+    summary.index.name = name
+    if ci is not None:
+        rng = np.random.default_rng(seed)
+        codes, uniques = pd.factorize(keys, sort=False)
+        values = df[value].to_numpy(dtype=np.float64)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        intervals = {}
+        for position, key in enumerate(uniques):
+            rows = order[bounds[position]:bounds[position + 1]]
+            intervals[key] = bootstrap_mean_ci(values[rows], ci=ci, n_boot=n_boot, rng=rng)
+        summary['ci_low'] = [intervals[key][0] for key in summary.index]
+        summary['ci_high'] = [intervals[key][1] for key in summary.index]
+    return summary.reset_index()
+
+
+def barplot_summary(summary, x, y='mean', ax=None, palette='viridis'):
+    """Draw a summary frame as a barplot, with its ``ci_low``/``ci_high`` as error bars if present."""
+    ax = ax or plt.gca()
+    data = summary.assign(**{x: summary[x].astype(str)})
+    sns.barplot(data=data, x=x, y=y, hue=x, palette=palette, legend=False, errorbar=None, ax=ax)
+    if y == 'mean' and 'ci_low' in data:
+        ax.errorbar(np.arange(len(data)), data[y],
+                    yerr=[data[y] - data['ci_low'], data['ci_high'] - data[y]],
+                    fmt='none', ecolor='black', capsize=3)
+    return ax
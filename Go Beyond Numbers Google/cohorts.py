@@ -0,0 +1,164 @@
+"""Cohort cube over year joined, country and industry, and time-to-unicorn distributions.
+
+Questions like "total valuation of the companies that joined after 2020, per
+country" filter the whole table on ``Year Joined`` and group it again each
+time. ``CohortCube`` does one ``bincount`` pass into a dense
+``(year, country, industry)`` NumPy cube of company counts and summed
+valuation, and keeps running totals along the year axis. Any year range is
+then the difference of two cube planes, so a slice costs
+``countries x industries`` operations however many companies there are.
+
+Time to unicorn (``Year Joined - Year Founded``) is binned per group with
+one ``bincount`` as well; quantiles are read from the cumulative histograms.
+
+Example:
+
+    cube = CohortCube(df_companies)
+    cube.totals(start=2021, by='Country/Region').head(10)   # joined after 2020
+    cube.by_year(country='India')
+    lag_quantiles(df_companies, by='Industry')
+"""
+
+import numpy as np
+import pandas as pd
+
+COUNTRY = 'Country/Region'
+INDUSTRY = 'Industry'
+
+
+def _codes(values):
+    """Return ``(int64 codes, labels)`` for a column; categoricals keep their categories."""
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), values.cat.categories
+    codes, labels = pd.factorize(values, sort=True, use_na_sentinel=True)
+    return codes.astype(np.int64), pd.Index(labels)
+
+
+class CohortCube:
+    """Company counts and summed ``value`` per (year joined, country, industry).
+
+    ``count`` and ``value`` have shape ``(years, countries, industries)``;
+    ``years``, ``countries`` and ``industries`` label the axes. Rows with a
+    missing year, country or industry are left out; a missing ``value`` adds to
+    the count but not to the sum.
+    """
+
+    def __init__(self, df, value='valuation_num', year='Year Joined'):
+        known = df[year].notna().to_numpy()
+        years = df[year].to_numpy(dtype=np.int64, na_value=0)
+        self.first_year = int(years[known].min()) if known.any() else 0
+        self.years = np.arange(self.first_year, int(years[known].max(initial=self.first_year - 1)) + 1)
+        country_codes, self.countries = _codes(df[COUNTRY])
+        industry_codes, self.industries = _codes(df[INDUSTRY])
+        shape = (len(self.years), len(self.countries), len(self.industries))
+
+        keep = known & (country_codes >= 0) & (industry_codes >= 0)
+        cells = np.ravel_multi_index(
+            (years[keep] - self.first_year, country_codes[keep], industry_codes[keep]), shape)
+        values = df[value].to_numpy(dtype=np.float64)[keep]
+        size = int(np.prod(shape))
+        self.count = np.bincount(cells, minlength=size).reshape(shape)
+        self.value = np.bincount(cells, weights=np.nan_to_num(values), minlength=size).reshape(shape)
+
+        # Running totals with a leading zero plane: years [a, b) = cum[b] - cum[a].
+        self._cum_count = np.concatenate([np.zeros((1,) + shape[1:], dtype=np.int64), self.count.cumsum(axis=0)])
+        self._cum_value = np.concatenate([np.zeros((1,) + shape[1:]), self.value.cumsum(axis=0)])
+
+    def _plane(self, year):
+        return int(np.clip(year - self.first_year, 0, len(self.years)))
+
+    def year_range(self, start=None, stop=None):
+        """Return ``(count, value)`` per (country, industry) for ``start <= year <= stop``.
+
+        Either bound may be None (open). Costs one subtraction of two planes.
+        """
+        first = 0 if start is None else self._plane(start)
+        last = len(self.years) if stop is None else self._plane(stop + 1)
+        last = max(first, last)
+        return (self._cum_count[last] - self._cum_count[first],
+                self._cum_value[last] - self._cum_value[first])
+
+    def totals(self, start=None, stop=None, by=COUNTRY):
+        """Companies and total value in a year range, per ``by`` (country or industry).
+
+        Returns a frame indexed by ``by`` with ``companies`` and ``valuation``
+        columns, sorted by valuation; groups without companies are dropped.
+        """
+        count, value = self.year_range(start, stop)
+        axis, labels = {COUNTRY: (1, self.countries), INDUSTRY: (0, self.industries)}[by]
+        frame = pd.DataFrame({'companies': count.sum(axis=axis), 'valuation': value.sum(axis=axis)},
+                             index=pd.Index(labels, name=by))
+        frame = frame[frame['companies'] > 0]
+        return frame.sort_values('valuation', ascending=False, kind='stable')
+
+    def _position(self, labels, label):
+        if label is None:
+            return slice(None)
+        position = labels.get_indexer([label])[0]
+        if position < 0:
+            raise KeyError(label)
+        return position
+
+    def by_year(self, country=None, industry=None, cumulative=False):
+        """Companies and valuation per year joined, optionally for one country and/or industry."""
+        cells = (slice(None), self._position(self.countries, country), self._position(self.industries, industry))
+        count, value = self.count[cells], self.value[cells]
+        count = count.reshape(len(self.years), -1).sum(axis=1)
+        value = value.reshape(len(self.years), -1).sum(axis=1)
+        frame = pd.DataFrame({'companies': count, 'valuation': value}, index=pd.Index(self.years, name='Year Joined'))
+        return frame.cumsum() if cumulative else frame
+
+
+def time_to_unicorn(df, joined='Year Joined', founded='Year Founded'):
+    """Years from founding to joining the unicorn list, as a nullable ``Int16`` array.
+
+    Missing where either year is.
+    """
+    return pd.array(df[joined], dtype='Int16') - pd.array(df[founded], dtype='Int16')
+
+
+def lag_histogram(df, by=None):
+    """Companies per time to unicorn (columns, in years), per value of ``by`` (rows).
+
+    Built with one ``bincount`` over ``group * n_lags + lag``. Without ``by``
+    the frame has a single row labelled ``'all'``. Rows with a missing year
+    are left out.
+    """
+    lags = time_to_unicorn(df)
+    known = ~lags.isna()
+    lags = lags.to_numpy(dtype=np.int64, na_value=0)
+    low = int(lags[known].min()) if known.any() else 0
+    n_lags = int(lags[known].max(initial=low)) - low + 1
+    if by is None:
+        codes, labels = np.zeros(len(df), dtype=np.int64), pd.Index(['all'])
+    else:
+        codes, labels = _codes(df[by])
+    keep = known & (codes >= 0)
+    counts = np.bincount(codes[keep] * n_lags + (lags[keep] - low), minlength=len(labels) * n_lags)
+    return pd.DataFrame(counts.reshape(len(labels), n_lags),
+                        index=pd.Index(labels, name=by), columns=pd.RangeIndex(low, low + n_lags, name='years'))
+
+
+def lag_quantiles(df, by=None, q=(0.25, 0.5, 0.75)):
+    """Quantiles of time to unicorn per value of ``by``, read from the cumulative histograms.
+
+    Uses the lower of the two middle values where a quantile falls between
+    two companies (``np.quantile(..., method='lower')``). Also returns the
+    mean and number of companies per group.
+    """
+    histogram = lag_histogram(df, by)
+    counts = histogram.to_numpy()
+    histogram = histogram[counts.sum(axis=1) > 0]
+    counts = histogram.to_numpy()
+    totals = counts.sum(axis=1)
+    cumulative = counts.cumsum(axis=1)
+    years = histogram.columns.to_numpy()
+    result = {}
+    for quantile in q:
+        # Position of the ``floor(quantile * (n - 1))``-th company (0-based), per group.
+        target = np.floor(quantile * (totals - 1)).astype(np.int64)
+        result[f"q{round(quantile * 100)}"] = years[(cumulative <= target[:, None]).sum(axis=1)]
+    result['mean'] = counts @ years / totals
+    result['companies'] = totals
+    return pd.DataFrame(result, index=histogram.index)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+"""Incremental ingestion of daily ``Unicorn_Companies.csv`` snapshots.
+
+A daily file differs from the previous one in a handful of companies, yet a
+full reload parses, cleans and aggregates every row again. ``CompanyStore``
+keeps the cleaned table together with a 64-bit hash of each company's key
+(``KEY_COLUMNS``: Company plus Date Joined) and of its parsed raw row, and
+the derived aggregates the activity uses:
+
+* national valuations (a ``topn.RankingTotals``);
+* missing values per column;
+* rows per city, for the investor's city filters.
+
+``refresh`` reads the new snapshot with the typed schema (categoricals, so
+the repeated strings are parsed once), hashes each row's parsed values,
+compares the hashes with the stored ones in one vectorized join, and then
+cleans and applies only the new, changed and removed companies. Feeds that
+already deliver a delta can call ``apply_changes`` directly; their rows are
+hashed the same way, so a row hashes alike whichever path brought it in
+(``N/A`` and an empty field are both a missing value, for instance).
+
+Removed and replaced rows are marked dead and new rows are appended to a
+pending list; ``compact`` folds both into the table, and ``save`` compacts
+before writing the store as Parquet.
+
+Usage:
+
+    python delta.py Unicorn_Companies.csv          # refresh (or build) .cache/store.parquet
+    python delta.py companies_2024-05-02.csv --store store.parquet
+"""
+
+import argparse
+import os
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dates import parse_dates
+from dictionaries import DictionarySet
+from loader import COLUMNS, COMPANIES_CSV, KEY_COLUMNS, clean_companies, read_companies_csv
+from missing import null_mask
+from table_cache import CACHE_DIR
+from topn import RankingTotals
+
+STORE_FILE = "store.parquet"
+ROW_HASH = '_row_hash'
+
+# Compact automatically once this share of the stored rows is dead.
+COMPACT_RATIO = 0.25
+
+Delta = namedtuple('Delta', ['added', 'changed', 'removed'])
+
+
+Snapshot = namedtuple('Snapshot', ['keys', 'hashes', 'read_rows'])
+
+# Folds the date into the company name's hash in ``key_hashes``.
+_HASH_PRIME = np.uint64(0x100000001B3)
+
+
+def line_hashes(lines):
+    """64-bit hash per bytes string: CRC-32 in the high half, Adler-32 in the low half."""
+    crc = np.fromiter(map(zlib.crc32, lines), dtype=np.uint64, count=len(lines))
+    adler = np.fromiter(map(zlib.adler32, lines), dtype=np.uint64, count=len(lines))
+    return crc << np.uint64(32) | adler
+
+
+def key_hashes(company, date_joined):
+    """Return one uint64 hash per (Company, parsed Date Joined) pair."""
+    names = line_hashes(list(map(str.encode, pd.Series(company).tolist())))
+    dates = pd.Series(date_joined).to_numpy(dtype='datetime64[ns]').view(np.uint64)
+    return names * _HASH_PRIME ^ dates
+
+
+def row_hashes(raw):
+    """Return one uint64 hash per row of ``raw`` (raw rows, as ``read_companies_csv`` parses them).
+
+    The hash covers the parsed value of every column in ``COLUMNS``, not
+    the text it was read from, and does not depend on the dtype holding it
+    (a categorical and a string column of the same values hash alike).
+    """
+    return pd.util.hash_pandas_object(raw[COLUMNS], index=False).to_numpy(dtype=np.uint64)
+
+
+def scan_snapshot(path):
+    """Parse a snapshot with the typed schema and hash its rows and keys.
+
+    Returns a ``Snapshot`` whose ``read_rows(positions)`` returns just those
+    raw rows.
+    """
+    raw = read_companies_csv(path)
+
+    def read_rows(positions):
+        return raw.iloc[positions].reset_index(drop=True)
+    return Snapshot(key_hashes(raw['Company'], parse_dates(raw['Date Joined'])), row_hashes(raw), read_rows)
+
+
+def _check_unique(keys):
+    if len(pd.unique(keys)) != len(keys):
+        raise ValueError(f"key columns {KEY_COLUMNS} do not uniquely identify the rows")
+
+
+class CompanyStore:
+    """Cleaned companies table plus aggregates, updated from deltas keyed by company.
+
+    ``df`` is a cleaned table (``loader.clean_companies``) with a
+    ``_row_hash`` column. ``dictionaries`` (default: a new in-memory
+    ``DictionarySet``) encodes the categorical columns, so appended rows
+    share the table's categories.
+    """
+
+    def __init__(self, df, dictionaries=None):
+        self.dictionaries = dictionaries if dictionaries is not None else DictionarySet()
+        self.frame = self.dictionaries.encode_frame(df.reset_index(drop=True))
+        self._pending = []
+        self.n_rows = len(self.frame)
+        self.alive = np.ones(self.n_rows, dtype=bool)
+        self.keys = key_hashes(self.frame['Company'], self.frame['Date Joined'])
+        self.hashes = self.frame[ROW_HASH].to_numpy(dtype=np.uint64)
+        _check_unique(self.keys)
+        self.national = RankingTotals(self.frame)
+        self.null_counts = np.array([null_mask(self.frame[column]).sum() for column in COLUMNS], dtype=np.int64)
+        self.city_rows = {city: set(rows.tolist()) for city, rows in
+                          self.frame.groupby('City', observed=True, sort=False).indices.items()}
+
+    @classmethod
+    def from_csv(cls, path=COMPANIES_CSV, dictionaries=None):
+        """Build a store from a full snapshot."""
+        raw = read_companies_csv(path)
+        raw[ROW_HASH] = row_hashes(raw)
+        return cls(clean_companies(raw), dictionaries)
+
+    @classmethod
+    def load(cls, path, dictionaries=None):
+        return cls(pd.read_parquet(path, engine="pyarrow"), dictionaries)
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def _rows(self, positions):
+        """Return the stored rows at ``positions`` (base table and pending rows)."""
+        positions = np.sort(np.asarray(positions, dtype=np.int64))
+        base = positions[positions < len(self.frame)]
+        parts = [self.frame.iloc[base]]
+        extra = positions[positions >= len(self.frame)] - len(self.frame)
+        if len(extra):
+            parts.append(pd.concat(self._pending).iloc[extra])
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def _key_tuples(self, rows):
+        return list(zip(rows['Company'].tolist(), rows['Date Joined'].tolist()))
+
+    def _account(self, rows, positions, sign):
+        """Add (``sign=1``) or subtract (``-1``) ``rows`` from the null counts and the city index."""
+        for i, column in enumerate(COLUMNS):
+            self.null_counts[i] += sign * int(null_mask(rows[column]).sum())
+        for city, position in zip(rows['City'].tolist(), positions.tolist()):
+            if city != city:
+                continue
+            if sign > 0:
+                self.city_rows.setdefault(city, set()).add(position)
+            else:
+                self.city_rows[city].discard(position)
+
+    def diff(self, keys, hashes):
+        """Compare a snapshot's key and row hashes with the store.
+
+        Returns ``Delta`` of snapshot positions (``added``, ``changed``) and
+        store positions (``removed``). Raises ``ValueError`` if the snapshot
+        repeats a key.
+        """
+        _check_unique(keys)
+        live = np.flatnonzero(self.alive)
+        found = pd.Index(self.keys[live]).get_indexer(keys)
+        stored = live[found[found >= 0]]
+        new_rows = np.flatnonzero(found < 0)
+        changed = np.flatnonzero(found >= 0)[self.hashes[stored] != hashes[found >= 0]]
+        seen = np.zeros(len(live), dtype=bool)
+        seen[found[found >= 0]] = True
+        return Delta(new_rows, changed, live[~seen])
+
+    def _drop(self, positions):
+        # Positions named twice or already dead must not be subtracted again.
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        positions = positions[self.alive[positions]]
+        if not len(positions):
+            return 0
+        rows = self._rows(positions)
+        self.alive[positions] = False
+        self._account(rows, positions, -1)
+        self.national.remove(self._key_tuples(rows))
+        return len(positions)
+
+    def _append(self, raw):
+        if not len(raw):
+            return
+        rows = self.dictionaries.encode_frame(clean_companies(raw.copy()))
+        rows.index = pd.RangeIndex(self.n_rows, self.n_rows + len(rows))
+        positions = np.arange(self.n_rows, self.n_rows + len(rows))
+        self._pending.append(rows)
+        self.n_rows += len(rows)
+        self.alive = np.concatenate([self.alive, np.ones(len(rows), dtype=bool)])
+        self.keys = np.concatenate([self.keys, key_hashes(rows['Company'], rows['Date Joined'])])
+        self.hashes = np.concatenate([self.hashes, rows[ROW_HASH].to_numpy(dtype=np.uint64)])
+        self._account(rows, positions, 1)
+        self.national.upsert(rows)
+
+    def apply_changes(self, upserts=None, removed=None):
+        """Apply a delta: ``upserts`` are raw rows (new or changed companies), ``removed`` store positions.
+
+        Raw rows without ``_row_hash`` get one. Changed companies replace
+        their stored row; ``upserts`` must not repeat a key. Removed
+        positions that are already dead are ignored. Returns the number of
+        rows added and removed.
+        """
+        upserts = upserts if upserts is not None else pd.DataFrame(columns=COLUMNS)
+        if ROW_HASH not in upserts:
+            upserts = upserts.assign(**{ROW_HASH: row_hashes(upserts)})
+        replaced = np.zeros(0, dtype=np.int64)
+        if len(upserts):
+            keys = key_hashes(upserts['Company'], parse_dates(upserts['Date Joined']))
+            _check_unique(keys)
+            live = np.flatnonzero(self.alive)
+            found = pd.Index(self.keys[live]).get_indexer(keys)
+            replaced = live[found[found >= 0]]
+        removed = np.union1d(np.asarray(removed if removed is not None else [], dtype=np.int64), replaced)
+        n_removed = self._drop(removed)
+        self._append(upserts)
+        if (~self.alive).sum() > COMPACT_RATIO * self.n_rows:
+            self.compact()
+        return len(upserts), n_removed
+
+    def refresh(self, path):
+        """Bring the store up to date with the snapshot at ``path``. Returns the ``Delta`` applied."""
+        snapshot = scan_snapshot(path)
+        delta = self.diff(snapshot.keys, snapshot.hashes)
+        changed = np.sort(np.concatenate([delta.added, delta.changed]))
+        upserts = snapshot.read_rows(changed)
+        upserts[ROW_HASH] = snapshot.hashes[changed]
+        self.apply_changes(upserts, delta.removed)
+        return delta
+
+    def compact(self):
+        """Fold pending rows into the table and drop dead rows; rebuilds the per-row state."""
+        frame = pd.concat([self.frame] + self._pending) if self._pending else self.frame
+        self.__init__(frame[self.alive].reset_index(drop=True), self.dictionaries)
+        return self
+
+    def table(self):
+        """Return the current cleaned table (compacting first)."""
+        return self.compact().frame.drop(columns=[ROW_HASH])
+
+    def national_valuations(self):
+        """Current total valuation per country."""
+        return self.national.totals()
+
+    def missing_counts(self):
+        """Current missing values per raw column, like ``df.isna().sum()``."""
+        return pd.Series(self.null_counts, index=COLUMNS)
+
+    def city_filter(self, cities, industry=None):
+        """Current rows in ``cities`` (optionally only ``industry``), from the city index."""
+        cities = [cities] if isinstance(cities, str) else cities
+        positions = sorted(set().union(*(self.city_rows.get(city, set()) for city in cities)))
+        rows = self._rows(positions)
+        if industry is not None:
+            industry = [industry] if isinstance(industry, str) else industry
+            rows = rows[rows['Industry'].isin(industry)]
+        return rows.drop(columns=[ROW_HASH])
+
+    def save(self, path):
+        """Compact and write the store to ``path`` as Parquet."""
+        self.compact()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.frame.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=COMPANIES_CSV, help="today's snapshot")
+    parser.add_argument("--store", default=os.path.join(CACHE_DIR, STORE_FILE))
+    args = parser.parse_args(argv)
+
+    dictionaries = DictionarySet.load()
+    start = time.perf_counter()
+    if os.path.exists(args.store):
+        store = CompanyStore.load(args.store, dictionaries)
+        loaded = time.perf_counter()
+        delta = store.refresh(args.source)
+        print(f"loaded {len(store) + len(delta.removed) - len(delta.added):,} companies "
+              f"in {(loaded - start) * 1e3:.0f} ms; refreshed in {(time.perf_counter() - loaded) * 1e3:.0f} ms: "
+              f"{len(delta.added)} new, {len(delta.changed)} changed, {len(delta.removed)} removed")
+    else:
+        store = CompanyStore.from_csv(args.source, dictionaries)
+        print(f"built store of {len(store):,} companies in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    store.save(args.store)
+    dictionaries.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Global, persistent dictionaries for the companies table's categorical columns.
+
+``loader.SCHEMA`` already reads City, Country/Region, Continent and Industry
+as categoricals, but each load builds its own categories from the values in
+that file, so the code of "London" in one day's file can differ from its
+code in the next, and codes from two files cannot be compared or combined.
+
+A ``DictionarySet`` keeps one append-only ``Dictionary`` per column and is
+saved as JSON next to the table cache. Encoding a frame turns each column
+into a categorical whose categories are the whole dictionary, so:
+
+* a value keeps the same int code in every file encoded with the set;
+* values seen for the first time are appended, never reordered;
+* filters, ``groupby`` and equality checks run on the int codes.
+
+Encoding looks up each distinct value once (or each category, for columns
+that are already categorical) and gathers the per-row codes with ``take``.
+
+Example:
+
+    dictionaries = DictionarySet.load()
+    df_companies = load_companies(dictionaries=dictionaries)
+    dictionaries.save()
+    df_companies['City'].cat.codes  # stable across files and runs
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from loader import CATEGORY_COLUMNS
+from table_cache import CACHE_DIR
+
+DICTIONARY_FILE = "dictionaries.json"
+
+ENCODED_COLUMNS = CATEGORY_COLUMNS
+
+
+class Dictionary:
+    """Append-only mapping between the distinct strings of one column and int codes."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self._codes
+
+    def extend(self, values):
+        """Append the values not seen before, in sorted order. Returns how many were added."""
+        new = sorted({value for value in values if value not in self._codes and not pd.isna(value)})
+        for value in new:
+            self._codes[value] = len(self.values)
+            self.values.append(value)
+        return len(new)
+
+    def code_of(self, value):
+        """Return the code of ``value``, or -1 if it is missing or unknown."""
+        return self._codes.get(value, -1)
+
+    def encode(self, values, grow=True):
+        """Return the int32 codes of ``values``; -1 for missing (and, with ``grow=False``, unknown) values."""
+        values = pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        if grow:
+            self.extend(uniques)
+        lookup = np.array([self.code_of(value) for value in uniques] + [-1], dtype=np.int32)
+        # Code -1 (missing) indexes the trailing -1 of ``lookup``.
+        return lookup.take(codes)
+
+    def categories(self):
+        return pd.Index(self.values, dtype=object)
+
+    def categorical(self, values, grow=True):
+        """Return ``values`` as a categorical whose categories are this dictionary."""
+        codes = self.encode(values, grow)
+        return pd.Categorical.from_codes(codes, categories=self.categories())
+
+    def decode(self, codes):
+        """Return the values of ``codes`` (NaN for -1)."""
+        codes = np.asarray(codes)
+        return np.append(np.array(self.values, dtype=object), np.nan).take(np.where(codes < 0, len(self), codes))
+
+
+class DictionarySet:
+    """One ``Dictionary`` per column, loaded from and saved to a JSON file.
+
+    Only one process should update a given file at a time; a write replaces
+    the file atomically but does not merge with concurrent writers.
+    """
+
+    def __init__(self, dictionaries=None, path=None):
+        self.dictionaries = dict(dictionaries or {})
+        self.path = path
+        self._saved_sizes = self._sizes()
+
+    @classmethod
+    def load(cls, path=None):
+        """Read the set from ``path`` (default: ``<cache dir>/dictionaries.json``); empty if it does not exist."""
+        path = path or os.path.join(CACHE_DIR, DICTIONARY_FILE)
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            stored = {}
+        return cls({column: Dictionary(values) for column, values in stored.items()}, path)
+
+    def _sizes(self):
+        return {column: len(dictionary) for column, dictionary in self.dictionaries.items()}
+
+    def __getitem__(self, column):
+        if column not in self.dictionaries:
+            self.dictionaries[column] = Dictionary()
+        return self.dictionaries[column]
+
+    def __contains__(self, column):
+        return column in self.dictionaries
+
+    @property
+    def changed(self):
+        """True if values were added since the set was loaded or last saved."""
+        return self._sizes() != self._saved_sizes
+
+    def encode_frame(self, df, columns=ENCODED_COLUMNS, grow=True):
+        """Replace ``columns`` of ``df`` (those present) with categoricals over the global dictionaries.
+
+        The frame is modified in place and returned.
+        """
+        for column in columns:
+            if column in df:
+                df[column] = self[column].categorical(df[column], grow)
+        return df
+
+    def save(self, path=None):
+        """Write the set to ``path`` (default: the path it was loaded from) if it changed."""
+        path = path or self.path or os.path.join(CACHE_DIR, DICTIONARY_FILE)
+        if not self.changed and path == self.path and os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({column: dictionary.values for column, dictionary in self.dictionaries.items()}, f, indent=1)
+        os.replace(tmp_path, path)
+        self.path = path
+        self._saved_sizes = self._sizes()
+        return path
@@ -0,0 +1,177 @@
+"""Inverted bitmap index for the investor's City / Industry / Country / Continent filters.
+
+``df_companies['City'].isin([...])`` scans every row for every question.
+``FilterIndex`` groups, once, the row positions of each distinct value of
+the indexed columns, and keeps a packed row bitmap (one bit per row, 64 rows
+per ``uint64`` word) for the values common enough to need one. A filter is
+answered by OR-ing the bitmaps of the requested values within a column (rare
+values are packed from their positions on the fly) and AND-ing across
+columns, which touches ``n_rows / 64`` words instead of ``n_rows`` strings.
+The index takes at most a few bytes per row and column, however many
+distinct cities a column holds.
+
+Example:
+
+    index = FilterIndex(df_companies)
+    rows = index.rows({'Industry': 'Hardware', 'City': ['Beijing', 'San Francisco', 'London']})
+    df_companies.iloc[rows]
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ['City', 'Industry', 'Country/Region', 'Continent']
+
+
+def _as_list(values):
+    if isinstance(values, str) or not hasattr(values, '__iter__'):
+        return [values]
+    return list(values)
+
+
+Postings = namedtuple('Postings', ['indptr', 'rows', 'dense'])
+
+
+def rows_to_words(rows, n_words):
+    """Return the packed bitmap (``n_words`` uint64 words) with bit ``row`` set for each of ``rows``."""
+    words = np.zeros(n_words, dtype=np.uint64)
+    np.bitwise_or.at(words, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return words
+
+
+def mask_to_words(mask):
+    """Pack a boolean row mask into uint64 words (bit ``row % 64`` of word ``row // 64``)."""
+    packed = np.packbits(mask, bitorder='little')
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view('<u8').astype(np.uint64, copy=False)
+
+
+def build_postings(codes, n_codes):
+    """Return the ``Postings`` of a factorized column.
+
+    Every value keeps its row positions, in order, as one slice of ``rows``
+    (``rows[indptr[code]:indptr[code + 1]]``), found with one stable argsort
+    of the codes. A value frequent enough that its positions would take more
+    space than a bitmap of the whole table also gets a packed bitmap in
+    ``dense`` (keyed by code), so the common filters are still a word-wise OR.
+    Neither part depends on the product of distinct values and rows: at most
+    ``32`` (int32 positions) or ``64`` values per column are dense, and the
+    positions take one int per non-missing row. Rows with code -1 (missing)
+    are left out.
+    """
+    n_rows = len(codes)
+    index_dtype = np.int32 if n_rows < 2**31 else np.int64
+    order = np.argsort(codes, kind='stable').astype(index_dtype)
+    counts = np.bincount(codes[codes >= 0], minlength=n_codes)
+    indptr = np.zeros(n_codes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    rows = order[len(codes) - indptr[-1]:]
+    n_words = (n_rows + 63) // 64
+    dense_min = n_words * 8 // np.dtype(index_dtype).itemsize + 1
+    dense = {int(code): mask_to_words(codes == code) for code in np.flatnonzero(counts >= dense_min)}
+    return Postings(indptr, rows, dense)
+
+
+def scan_mask(df, filters):
+    """Row mask for ``filters`` from AND-ed ``isin`` scans of ``df``, the reference for ``FilterIndex.mask``."""
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in filters.items():
+        mask &= df[column].isin(_as_list(values)).to_numpy()
+    return mask
+
+
+def popcount(words):
+    """Return the number of set bits in a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+class FilterIndex:
+    """Bitmap index over the low-cardinality columns of a companies frame.
+
+    Filters are dicts mapping a column to one value or a list of values:
+    values in a list are OR-ed, columns are AND-ed. ``rows`` / ``mask`` /
+    ``count`` accept one filter; ``any_of`` ORs several filters together.
+    Values that do not occur in the table match no rows.
+    """
+
+    def __init__(self, df, columns=INDEX_COLUMNS):
+        self.n_rows = len(df)
+        self.n_words = (self.n_rows + 63) // 64
+        self.positions = {}
+        self.postings = {}
+        for column in columns:
+            codes, uniques = pd.factorize(df[column], use_na_sentinel=True)
+            # Plain dict lookups are much cheaper than ``Index.get_indexer``
+            # for the handful of values a query names.
+            self.positions[column] = {value: i for i, value in enumerate(uniques)}
+            self.postings[column] = build_postings(codes, len(uniques))
+
+    @property
+    def nbytes(self):
+        """Memory held by the index's positions and bitmaps."""
+        return sum(postings.indptr.nbytes + postings.rows.nbytes
+                   + sum(words.nbytes for words in postings.dense.values())
+                   for postings in self.postings.values())
+
+    def bitmap(self, column, values):
+        """Return the OR of the bitmaps of ``values`` in ``column``."""
+        if column not in self.postings:
+            raise KeyError(f"column {column!r} is not indexed")
+        lookup = self.positions[column]
+        indptr, rows, dense = self.postings[column]
+        result = np.zeros(self.n_words, dtype=np.uint64)
+        sparse = []
+        for value in _as_list(values):
+            position = lookup.get(value)
+            if position in dense:
+                np.bitwise_or(result, dense[position], out=result)
+            elif position is not None:
+                sparse.append(rows[indptr[position]:indptr[position + 1]])
+        if sparse:
+            np.bitwise_or(result, rows_to_words(np.concatenate(sparse), self.n_words), out=result)
+        return result
+
+    def query(self, filters):
+        """Return the packed bitmap of the rows matching every column in ``filters``."""
+        result = None
+        for column, values in filters.items():
+            words = self.bitmap(column, values)
+            result = words if result is None else np.bitwise_and(result, words, out=result)
+        if result is None:
+            result = self._all_rows()
+        return result
+
+    def any_of(self, *filters):
+        """Return the packed bitmap of the rows matching at least one of ``filters``."""
+        result = np.zeros(self.n_words, dtype=np.uint64)
+        for query in filters:
+            np.bitwise_or(result, self.query(query), out=result)
+        return result
+
+    def _all_rows(self):
+        words = np.full(self.n_words, np.uint64(0xFFFFFFFFFFFFFFFF))
+        if self.n_rows % 64:
+            words[-1] = np.uint64((1 << (self.n_rows % 64)) - 1)
+        return words
+
+    def to_mask(self, words):
+        """Unpack a bitmap into a boolean array of length ``n_rows``."""
+        bits = np.unpackbits(words.astype('<u8').view(np.uint8), bitorder='little')
+        return bits[:self.n_rows].view(bool)
+
+    def mask(self, filters):
+        """Boolean row mask for ``filters``, equivalent to AND-ed ``isin`` masks."""
+        return self.to_mask(self.query(filters))
+
+    def rows(self, filters):
+        """Row positions (for ``iloc``) matching ``filters``."""
+        return np.flatnonzero(self.mask(filters))
+
+    def count(self, filters):
+        """Number of rows matching ``filters`` without unpacking the bitmap."""
+        return popcount(self.query(filters))
@@ -0,0 +1,226 @@
+"""Fuzzy lookup of company and city names through a trigram inverted index.
+
+Analysts look companies up by partial or misspelled names ("Bytedanse") and
+join external lists against the table by name, where ``isin`` only finds
+exact spellings. Comparing a query with every name (edit distance per row)
+costs a full scan per query. ``NgramIndex`` instead indexes the distinct
+names of a column once:
+
+* each name is normalized (case folded, accents stripped, runs of
+  punctuation and spaces turned into one space) and padded as
+  ``'  name '``, so short names and word starts get their own trigrams;
+  its UTF-8 byte trigrams become 24-bit integer codes, extracted for all
+  names at once with NumPy;
+* a CSR inverted index maps each trigram to the names containing it, built
+  from one sort of ``(trigram, name)`` keys; the number of distinct trigrams
+  of each name is kept alongside;
+* the similarity of a query and a name is the Jaccard similarity of their
+  trigram sets, as in PostgreSQL's ``pg_trgm``. Postings hold each
+  (trigram, name) pair once, so counting how often each name occurs in the
+  posting lists of the query's trigrams (one ``bincount``) gives the number
+  of trigrams it shares with the query, from which the similarity follows;
+  a name reaching ``min_similarity`` must share at least
+  ``ceil(min_similarity * m)`` of the query's ``m`` trigrams, so only names
+  above that count are scored. No name is compared with the query string.
+
+``FuzzyIndex`` holds one ``NgramIndex`` per column (``Company`` and ``City``
+by default) and maps matches back to row positions.
+
+Example:
+
+    index = FuzzyIndex(df_companies)
+    index.search('Bytedanse')                     # top matches in Company
+    index.search('san fransisco', column='City', k=1)
+    index.match(['Stripe Inc.', 'Klarna'])        # bulk: best match per name
+    index.merge(external, left_on='name')         # join an external list on fuzzy Company
+"""
+
+import math
+import re
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from investors import gather
+
+FUZZY_COLUMNS = ['Company', 'City']
+
+MIN_SIMILARITY = 0.3
+
+Match = namedtuple('Match', ['name', 'similarity', 'rows'])
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def normalize(name):
+    """Case-fold ``name``, strip accents and collapse punctuation and whitespace into single spaces."""
+    text = unicodedata.normalize('NFKD', str(name).casefold())
+    if not text.isascii():
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def _padded(name):
+    return f"  {normalize(name)} "
+
+
+def trigrams(name):
+    """Return the sorted unique trigram codes of ``name`` (int64)."""
+    data = np.frombuffer(_padded(name).encode(), dtype=np.uint8).astype(np.int64)
+    if len(data) < 3:
+        return _EMPTY
+    return np.unique((data[:-2] << 16) | (data[1:-1] << 8) | data[2:])
+
+
+def _all_trigrams(names):
+    """Return ``(name ids, trigram codes)`` for every trigram occurrence in ``names``."""
+    array = pa.array([_padded(name) for name in names], type=pa.large_string())
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[:len(array) + 1]
+    data = np.frombuffer(data, dtype=np.uint8).astype(np.int64) if data is not None else _EMPTY
+    counts = np.maximum(np.diff(offsets) - 2, 0)
+    ids = np.repeat(np.arange(len(names), dtype=np.int64), counts)
+    positions = np.repeat(offsets[:-1] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    return ids, (data[positions] << 16) | (data[positions + 1] << 8) | data[positions + 2]
+
+
+def _indptr(keys, n_keys):
+    indptr = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=indptr[1:])
+    return indptr
+
+
+class NgramIndex:
+    """Trigram index over the distinct values of one name column.
+
+    ``names`` holds the distinct non-missing values in order of first
+    occurrence; a name's id is its position there. ``rows(id)`` returns the
+    row positions holding that name.
+    """
+
+    def __init__(self, values):
+        codes, names = pd.factorize(pd.Series(values).astype(object))
+        self.names = np.asarray(names, dtype=object)
+        n_names = len(self.names)
+
+        ids, grams = _all_trigrams(self.names)
+        # One sort of (trigram, name) keys groups the postings by trigram, in
+        # name order within each; dropping repeated keys counts a trigram
+        # once per name.
+        keys = np.sort((grams << 39) | ids)
+        if len(keys):
+            keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        grams, self.gram_names = keys >> 39, keys & ((1 << 39) - 1)
+        self.sizes = np.bincount(self.gram_names, minlength=n_names)
+        starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else _EMPTY
+        self.vocabulary = grams[starts]
+        self.gram_indptr = np.r_[starts, len(grams)].astype(np.int64)
+
+        present = np.flatnonzero(codes >= 0)
+        self.row_indptr = _indptr(codes[present], n_names)
+        self.row_order = present[np.argsort(codes[present], kind='stable')]
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, name_id):
+        """Row positions of the name with id ``name_id``."""
+        return self.row_order[self.row_indptr[name_id]:self.row_indptr[name_id + 1]]
+
+    def scores(self, query, min_similarity=MIN_SIMILARITY):
+        """Return ``(name ids, similarities)`` of the names at least ``min_similarity`` similar to ``query``."""
+        query_grams = trigrams(query)
+        m = len(query_grams)
+        if m == 0 or len(self.vocabulary) == 0:
+            return _EMPTY, np.zeros(0)
+        positions = np.minimum(np.searchsorted(self.vocabulary, query_grams), len(self.vocabulary) - 1)
+        known = positions[self.vocabulary[positions] == query_grams]
+        need = max(1, math.ceil(min_similarity * m - 1e-9))
+        if len(known) < need:
+            return _EMPTY, np.zeros(0)
+        shared = np.bincount(gather(self.gram_indptr, self.gram_names, known))
+        candidates = np.flatnonzero(shared >= need)
+        shared = shared[candidates]
+        similarity = shared / (m + self.sizes[candidates] - shared)
+        keep = similarity >= min_similarity - 1e-9
+        return candidates[keep], similarity[keep]
+
+    def search(self, query, k=5, min_similarity=MIN_SIMILARITY):
+        """Return up to ``k`` ``Match`` es for ``query``, most similar first."""
+        ids, similarity = self.scores(query, min_similarity)
+        top = np.lexsort((ids, -similarity))[:k]
+        return [Match(self.names[i], float(s), self.rows(i)) for i, s in zip(ids[top], similarity[top])]
+
+    def best(self, queries, min_similarity=MIN_SIMILARITY):
+        """Return ``(name ids, similarities)`` of the best match of every query (-1 and 0.0 if none).
+
+        Repeated queries are scored once.
+        """
+        codes, distinct = pd.factorize(pd.Series(queries).astype(object))
+        best_ids = np.full(len(distinct) + 1, -1, dtype=np.int64)
+        best_similarity = np.zeros(len(distinct) + 1)
+        for position, query in enumerate(distinct):
+            ids, similarity = self.scores(query, min_similarity)
+            if len(ids):
+                top = np.lexsort((ids, -similarity))[0]
+                best_ids[position], best_similarity[position] = ids[top], similarity[top]
+        # Missing queries have code -1 and pick the trailing "no match" slot.
+        return best_ids[codes], best_similarity[codes]
+
+
+class FuzzyIndex:
+    """``NgramIndex`` es over the name columns of a companies frame.
+
+    ``search`` returns ``Match`` es whose ``rows`` are row positions in
+    ``df``; ``match`` and ``merge`` resolve many names at once.
+    """
+
+    def __init__(self, df, columns=FUZZY_COLUMNS):
+        self.df = df
+        self.indexes = {column: NgramIndex(df[column]) for column in columns}
+
+    def _index(self, column):
+        try:
+            return self.indexes[column]
+        except KeyError:
+            raise KeyError(f"{column!r} is not indexed; indexed columns are {list(self.indexes)}") from None
+
+    def search(self, query, column='Company', k=5, min_similarity=MIN_SIMILARITY):
+        """Top-``k`` names of ``column`` similar to ``query``, most similar first."""
+        return self._index(column).search(query, k, min_similarity)
+
+    def match(self, names, column='Company', min_similarity=MIN_SIMILARITY):
+        """Best match in ``column`` for each of ``names``: a frame with ``query``, ``match`` and ``similarity``.
+
+        ``match`` is missing where no name reaches ``min_similarity``.
+        """
+        index = self._index(column)
+        ids, similarity = index.best(names, min_similarity)
+        matches = pd.Series(index.names[np.maximum(ids, 0)] if len(index) else np.full(len(ids), None),
+                            dtype=object).where(ids >= 0)
+        return pd.DataFrame({'query': list(names), 'match': matches, 'similarity': similarity})
+
+    def merge(self, left, left_on, column='Company', min_similarity=MIN_SIMILARITY, suffix='_match'):
+        """Inner join of ``left`` with the rows of ``df`` whose ``column`` best matches ``left[left_on]``.
+
+        Every row of ``df`` holding the best matching name is joined; rows
+        of ``left`` without a match are dropped (see ``match``). Columns of
+        ``df`` also in ``left`` get ``suffix``; ``similarity`` is added.
+        """
+        index = self._index(column)
+        ids, similarity = index.best(left[left_on], min_similarity)
+        matched = ids >= 0
+        counts = np.zeros(len(ids), dtype=np.int64)
+        counts[matched] = np.diff(index.row_indptr)[ids[matched]]
+        left_positions = np.repeat(np.arange(len(ids)), counts)
+        right_rows = gather(index.row_indptr, index.row_order, ids[matched])
+        right = self.df.iloc[right_rows].reset_index(drop=True)
+        right.columns = [f"{name}{suffix}" if name in left.columns else name for name in right.columns]
+        result = pd.concat([left.iloc[left_positions].reset_index(drop=True), right], axis=1)
+        result['similarity'] = similarity[left_positions]
+        return result
@@ -0,0 +1,172 @@
+"""Company <-> investor graph parsed from the ``Select Investors`` column.
+
+``Select Investors`` holds one comma-joined string per company, so "which
+companies does Sequoia Capital back?" is a substring scan of every row (which
+also matches "Sequoia Capital China"). ``InvestorGraph`` parses the column
+once into:
+
+* ``investors``: an interned dictionary of the distinct investor names
+  (an ``Index``; an investor's id is its position);
+* a CSR adjacency from companies to investors (``indptr`` / ``indices``)
+  and its transpose from investors to companies (``investor_indptr`` /
+  ``investor_rows``), as int32/int64 arrays.
+
+The strings are split with a single ``str.split`` over the joined column and
+only the distinct tokens are stripped, so parsing stays a few passes over
+flat arrays even with millions of company-investor edges. A portfolio lookup
+is then a slice of ``investor_rows``.
+
+Example:
+
+    df_companies = load_companies(analysis='investors')
+    graph = InvestorGraph(df_companies)
+    df_companies.iloc[graph.portfolio('Sequoia Capital')]
+    graph.co_investors('Sequoia Capital').head(10)
+    graph.total_valuation().head(10)
+"""
+
+import numpy as np
+import pandas as pd
+
+INVESTOR_COLUMN = 'Select Investors'
+
+
+def parse_edges(values, sep=','):
+    """Split separator-joined investor lists into edges.
+
+    Returns ``(rows, codes, investors)``: the row position and investor id
+    of every (company, investor) edge, sorted by row then investor with
+    duplicates removed, and the ``Index`` of investor names the ids point
+    into. Missing values and empty names produce no edges.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    present = values.notna().to_numpy()
+    strings = values[present].astype(str)
+    if not len(strings):
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), pd.Index([], dtype=object)
+    counts = np.zeros(len(values), dtype=np.int64)
+    counts[present] = strings.str.count(sep).to_numpy() + 1
+    tokens = np.array(sep.join(strings.tolist()).split(sep), dtype=object)
+    rows = np.repeat(np.arange(len(values), dtype=np.int64), counts)
+
+    # Strip only the distinct raw tokens, then merge names that differ only
+    # in surrounding whitespace.
+    token_codes, raw = pd.factorize(tokens)
+    names = pd.Index(raw).str.strip()
+    name_codes, investors = pd.factorize(names.where(names != '', None), use_na_sentinel=True)
+    codes = name_codes[token_codes]
+    keep = codes >= 0
+    rows, codes = rows[keep], codes[keep]
+
+    # Sort and drop repeats by hand: ``np.unique`` hashes first and is several
+    # times slower on millions of keys.
+    n = max(len(investors), 1)
+    keys = np.sort(rows * n + codes)
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys // n, (keys % n).astype(np.int32), pd.Index(investors, dtype=object)
+
+
+def _csr(keys, values, n_keys):
+    """Return ``(indptr, values sorted by key)`` for a CSR layout over ``n_keys`` keys."""
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_keys), out=indptr[1:])
+    return indptr, values[order]
+
+
+def gather(indptr, indices, rows):
+    """Concatenate ``indices[indptr[r]:indptr[r + 1]]`` for every ``r`` in ``rows`` (CSR row gather)."""
+    starts, stops = indptr[rows], indptr[rows + 1]
+    lengths = stops - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(lengths.sum())]
+
+
+class InvestorGraph:
+    """Interned investors plus CSR company -> investor and investor -> company adjacency.
+
+    Companies are identified by their row position in ``df``; investors by
+    name (or id). Investors that do not occur have an empty portfolio.
+    ``value`` (default ``valuation_num``) is used by ``total_valuation`` when
+    the frame has it.
+    """
+
+    def __init__(self, df, column=INVESTOR_COLUMN, value='valuation_num'):
+        self.n_companies = len(df)
+        rows, codes, self.investors = parse_edges(df[column])
+        self.n_edges = len(rows)
+        self._ids = {name: i for i, name in enumerate(self.investors)}
+        # Edges are sorted by row, so the company -> investor CSR is the edges as they are.
+        self.indptr = np.zeros(self.n_companies + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.n_companies), out=self.indptr[1:])
+        self.indices = codes
+        self.investor_indptr, self.investor_rows = _csr(codes, rows, len(self.investors))
+        self.values = df[value].to_numpy(dtype=np.float64) if value in df else None
+
+    def investor_id(self, investor):
+        """Return the id of ``investor`` (a name or an id), or -1 if it does not occur."""
+        if isinstance(investor, (int, np.integer)):
+            return int(investor)
+        return self._ids.get(investor, -1)
+
+    def portfolio(self, investor):
+        """Row positions of the companies backed by ``investor``, in row order."""
+        i = self.investor_id(investor)
+        if i < 0:
+            return np.zeros(0, dtype=np.int64)
+        return self.investor_rows[self.investor_indptr[i]:self.investor_indptr[i + 1]]
+
+    def investors_of(self, row):
+        """Names of the investors of the company at row position ``row``."""
+        return self.investors[self.indices[self.indptr[row]:self.indptr[row + 1]]]
+
+    def portfolio_sizes(self):
+        """Number of companies per investor, largest first."""
+        sizes = pd.Series(np.diff(self.investor_indptr), index=self.investors, name='companies')
+        return sizes.sort_values(ascending=False, kind='stable')
+
+    def co_investors(self, investor):
+        """Companies shared with ``investor``, per co-investor, most shared first."""
+        i = self.investor_id(investor)
+        partners = gather(self.indptr, self.indices, self.portfolio(investor))
+        counts = np.bincount(partners, minlength=len(self.investors))
+        if i >= 0:
+            counts[i] = 0
+        found = np.flatnonzero(counts)
+        shared = pd.Series(counts[found], index=self.investors[found], name='companies')
+        return shared.sort_values(ascending=False, kind='stable')
+
+    def co_investment_pairs(self, min_companies=1):
+        """Every pair of investors that back a company together, with the number of shared companies.
+
+        Pairs are built one offset at a time within each company's investor
+        list, so the work is ``edges x largest list`` rather than a join.
+        Returns a frame with ``investor_a``, ``investor_b`` and ``companies``.
+        """
+        degrees = np.diff(self.indptr)
+        position = np.arange(self.n_edges) - np.repeat(self.indptr[:-1], degrees)
+        remaining = np.repeat(degrees, degrees) - position - 1
+        n = np.int64(len(self.investors))
+        keys = []
+        for offset in range(1, int(degrees.max(initial=0))):
+            edges = np.flatnonzero(remaining >= offset)
+            a, b = self.indices[edges].astype(np.int64), self.indices[edges + offset].astype(np.int64)
+            keys.append(np.minimum(a, b) * n + np.maximum(a, b))
+        pairs, counts = np.unique(np.concatenate(keys or [np.zeros(0, dtype=np.int64)]), return_counts=True)
+        keep = counts >= min_companies
+        pairs, counts = pairs[keep], counts[keep]
+        frame = pd.DataFrame({
+            'investor_a': self.investors[pairs // n],
+            'investor_b': self.investors[pairs % n],
+            'companies': counts,
+        })
+        return frame.sort_values('companies', ascending=False, kind='stable', ignore_index=True)
+
+    def total_valuation(self):
+        """Sum of the ``value`` column over each investor's portfolio, largest first."""
+        if self.values is None:
+            raise ValueError("the frame had no value column; pass value= to InvestorGraph")
+        per_edge = np.nan_to_num(self.values[self.investor_rows])
+        investor_of_edge = np.repeat(np.arange(len(self.investors)), np.diff(self.investor_indptr))
+        totals = np.bincount(investor_of_edge, weights=per_edge, minlength=len(self.investors))
+        return pd.Series(totals, index=self.investors, name='valuation').sort_values(ascending=False, kind='stable')
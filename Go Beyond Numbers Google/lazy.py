@@ -0,0 +1,475 @@
+"""Lazy, deferred-execution queries over the companies dataset.
+
+The activity runs every step eagerly: ``df_companies.dropna().count()``
+builds a full copy of the table only to count it. A ``LazyFrame`` records
+``filter`` / ``select`` / ``dropna`` / ``groupby().agg()`` steps as a plan and
+runs nothing until ``collect()`` or ``count()`` is called. At that point
+
+* only the columns referenced anywhere in the plan are read (projection
+  pushdown into ``read_csv(usecols=...)`` or the Parquet column list),
+* row predicates are evaluated chunk by chunk as the file is read, and simple
+  comparisons are handed to the Parquet reader as row-group filters
+  (predicate pushdown), and
+* ``count()`` and aggregations are fused with the predicates: they consume a
+  row mask per chunk and never build the filtered frame. ``run_together``
+  answers several queries over the same source in one scan.
+
+Example:
+
+    companies = scan_csv('Unicorn_Companies.csv')
+    companies.dropna().count()                      # == df_companies.dropna().count()
+    (companies
+        .filter(col('Industry') == 'Hardware')
+        .filter(col('City').isin(['Beijing', 'San Francisco', 'London']))
+        .collect())
+    companies.groupby('Country/Region').agg(valuation_num='sum').collect()
+"""
+
+import operator
+import os
+
+import numpy as np
+import pandas as pd
+
+import table_cache
+from loader import COLUMNS, COMPANIES_CSV, DERIVED_FROM, clean_companies, read_companies_csv
+from shards import concat_shards
+
+CHUNKSIZE = 250_000
+
+# Partial aggregates and how they are merged across chunks.
+_MERGE = {'sum': 'sum', 'count': 'sum', 'size': 'sum', 'min': 'min', 'max': 'max'}
+AGGREGATIONS = set(_MERGE) | {'mean'}
+
+
+class Expr:
+    """A row predicate over named columns, built with ``col`` and ``&``, ``|``, ``~``."""
+
+    def __init__(self, op, column=None, value=None, args=()):
+        self.op = op
+        self.column = column
+        self.value = value
+        self.args = args
+
+    def __and__(self, other):
+        return Expr('and', args=(self, other))
+
+    def __or__(self, other):
+        return Expr('or', args=(self, other))
+
+    def __invert__(self):
+        return Expr('not', args=(self,))
+
+    def __repr__(self):
+        if self.op in ('and', 'or'):
+            return f"({self.args[0]!r} {self.op} {self.args[1]!r})"
+        if self.op == 'not':
+            return f"~{self.args[0]!r}"
+        if self.op in ('isna', 'notna'):
+            return f"col({self.column!r}).{self.op}()"
+        return f"col({self.column!r}) {self.op} {self.value!r}"
+
+    def columns(self):
+        """Return the set of columns the predicate reads."""
+        if self.column is not None:
+            return {self.column}
+        return set().union(*(arg.columns() for arg in self.args))
+
+    def evaluate(self, df):
+        """Return the predicate as a boolean array over the rows of ``df``."""
+        if self.op == 'and':
+            return self.args[0].evaluate(df) & self.args[1].evaluate(df)
+        if self.op == 'or':
+            return self.args[0].evaluate(df) | self.args[1].evaluate(df)
+        if self.op == 'not':
+            return ~self.args[0].evaluate(df)
+        series = df[self.column]
+        if self.op == 'isna':
+            return series.isna().to_numpy()
+        if self.op == 'notna':
+            return series.notna().to_numpy()
+        if self.op == 'in':
+            result = series.isin(self.value)
+        else:
+            result = _COMPARISONS[self.op](series, self.value)
+        return result.to_numpy(dtype=bool, na_value=False)
+
+    def arrow_filters(self):
+        """Return pyarrow DNF filters that keep every row the predicate keeps, or None.
+
+        The filters only prune rows; ``evaluate`` still runs on what is read.
+        pyarrow drops null rows from every comparison, while pandas keeps
+        missing values for ``!=`` (and for ``isin`` of a missing value), so
+        those are not pushed down. Of an ``and``, the side that can be
+        expressed is pushed on its own.
+        """
+        if self.op == 'and':
+            left, right = (arg.arrow_filters() for arg in self.args)
+            if left is None or right is None:
+                return left or right
+            return left + right
+        if self.op == 'in' and not any(pd.isna(value) for value in self.value):
+            return [(self.column, 'in', list(self.value))]
+        if self.op in _COMPARISONS and self.op != '!=' and not pd.isna(self.value):
+            return [(self.column, self.op, self.value)]
+        return None
+
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+class Column:
+    """Builds predicates on one column: ``col('Year Joined') > 2020``."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _compare(self, op, value):
+        return Expr(op, column=self.name, value=value)
+
+    def __eq__(self, value):
+        return self._compare('==', value)
+
+    def __ne__(self, value):
+        return self._compare('!=', value)
+
+    def __lt__(self, value):
+        return self._compare('<', value)
+
+    def __le__(self, value):
+        return self._compare('<=', value)
+
+    def __gt__(self, value):
+        return self._compare('>', value)
+
+    def __ge__(self, value):
+        return self._compare('>=', value)
+
+    __hash__ = None
+
+    def isin(self, values):
+        return Expr('in', column=self.name, value=list(values))
+
+    def isna(self):
+        return Expr('isna', column=self.name)
+
+    def notna(self):
+        return Expr('notna', column=self.name)
+
+
+def col(name):
+    """Refer to a column in a predicate."""
+    return Column(name)
+
+
+class CsvSource:
+    """Reads the companies CSV in chunks with the typed schema and derived columns."""
+
+    def __init__(self, path=COMPANIES_CSV, chunksize=CHUNKSIZE):
+        self.path = path
+        self.chunksize = chunksize
+        self.columns = list(COLUMNS) + list(DERIVED_FROM)
+
+    def __repr__(self):
+        return f"CsvSource({self.path!r}, chunksize={self.chunksize})"
+
+    def chunks(self, columns, predicate=None):
+        """Yield frames holding ``columns`` (raw or derived), ``chunksize`` rows at a time."""
+        raw = {DERIVED_FROM.get(column, column) for column in columns}
+        usecols = [column for column in COLUMNS if column in raw]
+        for chunk in read_companies_csv(self.path, usecols=usecols, chunksize=self.chunksize):
+            yield clean_companies(chunk)[list(columns)]
+
+
+class ParquetSource:
+    """Reads a Parquet file such as the ``table_cache`` output, pushing filters to pyarrow."""
+
+    def __init__(self, path):
+        self.path = path
+        import pyarrow.parquet as pq
+        self.columns = list(pq.read_schema(path).names)
+
+    def __repr__(self):
+        return f"ParquetSource({self.path!r})"
+
+    def chunks(self, columns, predicate=None):
+        filters = predicate.arrow_filters() if predicate is not None else None
+        yield pd.read_parquet(self.path, columns=list(columns), filters=filters, memory_map=True)
+
+
+def scan_csv(path=COMPANIES_CSV, chunksize=CHUNKSIZE):
+    """Start a lazy query over the companies CSV."""
+    return LazyFrame(CsvSource(path, chunksize))
+
+
+def scan_parquet(path):
+    """Start a lazy query over a Parquet file with the cleaned companies schema."""
+    return LazyFrame(ParquetSource(path))
+
+
+def scan_cached(path=COMPANIES_CSV):
+    """Start a lazy query over the Parquet cache of ``path``, building it if needed."""
+    cache = table_cache.cache_path(path)
+    if not os.path.exists(cache):
+        table_cache.build_cache(path)
+    return scan_parquet(cache)
+
+
+class LazyFrame:
+    """An unevaluated query: a source plus row predicates, a projection and an optional aggregation."""
+
+    def __init__(self, source, predicate=None, selection=None, group_by=None, aggregations=None):
+        self.source = source
+        self.predicate = predicate
+        self.selection = selection
+        self.group_by = group_by
+        self.aggregations = aggregations
+
+    def _replace(self, **changes):
+        if self.group_by is not None:
+            raise ValueError("cannot extend a query after groupby().agg()")
+        state = dict(predicate=self.predicate, selection=self.selection,
+                     group_by=self.group_by, aggregations=self.aggregations)
+        state.update(changes)
+        return LazyFrame(self.source, **state)
+
+    def _check(self, columns):
+        unknown = set(columns).difference(self.source.columns)
+        if unknown:
+            raise KeyError(f"unknown columns: {sorted(unknown)}")
+
+    @property
+    def columns(self):
+        """The output columns of the query."""
+        if self.group_by is not None:
+            return list(self.aggregations)
+        return list(self.selection if self.selection is not None else self.source.columns)
+
+    def filter(self, predicate):
+        """Keep only the rows where ``predicate`` holds."""
+        self._check(predicate.columns())
+        if self.predicate is not None:
+            predicate = self.predicate & predicate
+        return self._replace(predicate=predicate)
+
+    def select(self, *columns):
+        """Keep only ``columns`` in the output."""
+        self._check(columns)
+        return self._replace(selection=list(columns))
+
+    def dropna(self, subset=None):
+        """Drop rows with a missing value in ``subset`` (default: every output column)."""
+        subset = list(subset) if subset is not None else self.columns
+        self._check(subset)
+        predicate = None
+        for column in subset:
+            notna = col(column).notna()
+            predicate = notna if predicate is None else predicate & notna
+        return self.filter(predicate) if predicate is not None else self
+
+    def groupby(self, *by):
+        """Group by ``by``; finish with ``.agg(output=(column, func))`` or ``.agg(column=func)``."""
+        self._check(by)
+        return LazyGroupBy(self, list(by))
+
+    def _read_columns(self):
+        columns = set(self.columns) if self.group_by is None else set(self.group_by)
+        if self.aggregations:
+            columns.update(column for column, _ in self.aggregations.values())
+        if self.predicate is not None:
+            columns.update(self.predicate.columns())
+        return [column for column in self.source.columns if column in columns]
+
+    def explain(self):
+        """Return a text description of the optimized plan."""
+        lines = [f"scan {self.source!r}", f"  project {self._read_columns()}"]
+        if self.predicate is not None:
+            lines.append(f"  filter {self.predicate!r}")
+            pushed = self.predicate.arrow_filters()
+            if isinstance(self.source, ParquetSource) and pushed is not None:
+                lines.append(f"  pushed to reader {pushed}")
+        if self.group_by is not None:
+            lines.append(f"groupby {self.group_by} agg {self.aggregations}")
+        else:
+            lines.append(f"output {self.columns}")
+        return "\n".join(lines)
+
+    def _consumer(self, action):
+        if self.group_by is not None:
+            if action != 'collect':
+                raise ValueError("aggregated queries only support 'collect'")
+            return _Groups(self)
+        try:
+            return _CONSUMERS[action](self)
+        except KeyError:
+            raise ValueError(f"unknown action {action!r}; expected one of {sorted(_CONSUMERS)}") from None
+
+    def collect(self):
+        """Run the query and return a DataFrame."""
+        return run_together((self, 'collect'))[0]
+
+    def count(self):
+        """Non-missing values per output column, like ``DataFrame.count()`` on the collected result.
+
+        The row mask of each chunk is combined with each column's null mask, so
+        the filtered frame is never built.
+        """
+        if self.group_by is not None:
+            return self.collect().count()
+        return run_together((self, 'count'))[0]
+
+    def count_rows(self):
+        """Number of rows the query would return."""
+        if self.group_by is not None:
+            return len(self.collect())
+        return run_together((self, 'count_rows'))[0]
+
+
+class _Collect:
+    def __init__(self, frame):
+        self.columns = frame.columns
+        self.parts = []
+
+    def feed(self, chunk, mask):
+        self.parts.append(chunk.loc[mask, self.columns] if mask is not None else chunk[self.columns])
+
+    def result(self):
+        if not self.parts:
+            return pd.DataFrame(columns=self.columns)
+        if len(self.parts) == 1:
+            return self.parts[0].reset_index(drop=True)
+        # Each CSV chunk has its own categories; ``pd.concat`` would turn the
+        # categorical columns into strings where they differ.
+        return concat_shards(self.parts)
+
+
+class _Count:
+    def __init__(self, frame):
+        self.totals = dict.fromkeys(frame.columns, 0)
+
+    def feed(self, chunk, mask):
+        for column in self.totals:
+            present = chunk[column].notna().to_numpy()
+            if mask is not None:
+                present = present & mask
+            self.totals[column] += int(np.count_nonzero(present))
+
+    def result(self):
+        return pd.Series(self.totals, dtype=np.int64)
+
+
+class _CountRows:
+    def __init__(self, frame):
+        self.rows = 0
+
+    def feed(self, chunk, mask):
+        self.rows += int(np.count_nonzero(mask)) if mask is not None else len(chunk)
+
+    def result(self):
+        return self.rows
+
+
+class _Groups:
+    """Partial per-chunk aggregation merged into running per-group totals."""
+
+    def __init__(self, frame):
+        self.by = frame.group_by
+        self.aggregations = frame.aggregations
+        self.partials = None
+        self.specs = []
+        for column, func in self.aggregations.values():
+            for partial in (('sum', 'count') if func == 'mean' else (func,)):
+                if (column, partial) not in self.specs:
+                    self.specs.append((column, partial))
+
+    def feed(self, chunk, mask):
+        if mask is not None:
+            chunk = chunk[mask]
+        grouped = chunk.groupby(self.by, observed=True, sort=False)
+        partial = pd.DataFrame({
+            f"{column}:{func}": getattr(grouped[column], func)() for column, func in self.specs
+        })
+        if self.partials is None:
+            self.partials = partial
+            return
+        merge = {name: _MERGE[name.rsplit(':', 1)[1]] for name in partial.columns}
+        self.partials = (pd.concat([self.partials, partial])
+                         .groupby(level=list(range(len(self.by))), sort=False).agg(merge))
+
+    def result(self):
+        partials = self.partials
+        result = pd.DataFrame(index=partials.index if partials is not None else None)
+        for name, (column, func) in self.aggregations.items():
+            if partials is None:
+                result[name] = []
+            elif func == 'mean':
+                result[name] = partials[f"{column}:sum"] / partials[f"{column}:count"]
+            else:
+                result[name] = partials[f"{column}:{func}"]
+        return result.sort_index()
+
+
+_CONSUMERS = {'collect': _Collect, 'count': _Count, 'count_rows': _CountRows}
+
+
+def run_together(*jobs):
+    """Run several queries over the same source in a single scan.
+
+    Each job is ``(lazy_frame, action)`` with ``action`` one of ``'collect'``,
+    ``'count'`` or ``'count_rows'``. The union of the columns the jobs need is
+    read once and every chunk is fed to all of them. Returns the results in
+    job order.
+
+    Example:
+
+        companies = scan_csv()
+        count_total, count_dropna_rows = run_together(
+            (companies, 'count'), (companies.dropna(), 'count'))
+    """
+    if not jobs:
+        return []
+    source = jobs[0][0].source
+    if any(frame.source is not source for frame, _ in jobs):
+        raise ValueError("run_together() needs queries built from the same source")
+    consumers = [frame._consumer(action) for frame, action in jobs]
+    needed = set().union(*(frame._read_columns() for frame, _ in jobs))
+    columns = [column for column in source.columns if column in needed]
+    # Reader-level filtering is only safe when a single query is running.
+    pushed = jobs[0][0].predicate if len(jobs) == 1 else None
+    for chunk in source.chunks(columns, pushed):
+        masks = {}
+        for (frame, _), consumer in zip(jobs, consumers):
+            predicate = frame.predicate
+            if predicate is not None and id(predicate) not in masks:
+                masks[id(predicate)] = predicate.evaluate(chunk)
+            consumer.feed(chunk, masks[id(predicate)] if predicate is not None else None)
+    return [consumer.result() for consumer in consumers]
+
+
+class LazyGroupBy:
+    """Pending ``groupby``; call ``agg`` to get a LazyFrame."""
+
+    def __init__(self, frame, by):
+        self.frame = frame
+        self.by = by
+
+    def agg(self, **aggregations):
+        """Aggregate with ``name=(column, func)`` or ``column=func``.
+
+        ``func`` is one of ``sum``, ``count``, ``size``, ``min``, ``max`` or ``mean``.
+        """
+        specs = {}
+        for name, spec in aggregations.items():
+            column, func = (name, spec) if isinstance(spec, str) else spec
+            if func not in AGGREGATIONS:
+                raise ValueError(f"unsupported aggregation {func!r}; expected one of {sorted(AGGREGATIONS)}")
+            self.frame._check([column])
+            specs[name] = (column, func)
+        return self.frame._replace(group_by=self.by, aggregations=specs)
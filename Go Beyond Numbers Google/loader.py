@@ -0,0 +1,161 @@
+"""Typed, columnar loader for ``Unicorn_Companies.csv``.
+
+A bare ``pd.read_csv`` gives one Python string per cell for columns that only
+hold a few dozen distinct values. ``load_companies`` reads the file with a
+declared schema instead: categoricals for the low-cardinality columns, int16
+years and already-parsed money and date columns. ``analysis=`` prunes the
+columns read to the ones a downstream step needs.
+"""
+
+from contextlib import nullcontext
+
+import pandas as pd
+
+from dates import DATE_FORMAT, parse_dates_with_year
+from money import BILLION, parse_money
+
+COMPANIES_CSV = "Unicorn_Companies.csv"
+
+COLUMNS = [
+    'Company',
+    'Valuation',
+    'Date Joined',
+    'Industry',
+    'City',
+    'Country/Region',
+    'Continent',
+    'Year Founded',
+    'Funding',
+    'Select Investors',
+]
+
+# Columns that identify a company; ``Company`` alone is not unique (there are
+# two different "Bolt"s).
+KEY_COLUMNS = ['Company', 'Date Joined']
+
+CATEGORY_COLUMNS = ['Industry', 'City', 'Country/Region', 'Continent']
+
+# dtypes passed to ``read_csv``. ``Valuation``, ``Funding`` and ``Date Joined``
+# are read as categoricals so the parsers below only see the distinct strings.
+# ``Company`` and ``Select Investors`` are close to unique per row and keep
+# the default string dtype.
+SCHEMA = {
+    'Valuation': 'category',
+    'Date Joined': 'category',
+    'Industry': 'category',
+    'City': 'category',
+    'Country/Region': 'category',
+    'Continent': 'category',
+    'Year Founded': 'int16',
+    'Funding': 'category',
+}
+
+# Columns added by ``clean_companies`` and the raw column each is derived from.
+DERIVED_FROM = {
+    'Year Joined': 'Date Joined',
+    'valuation_num': 'Valuation',
+    'funding_num': 'Funding',
+}
+
+# Raw columns needed by each downstream analysis of the activity.
+ANALYSES = {
+    'national_valuations': ['Country/Region', 'Valuation'],
+    'investor_filters': ['Company', 'Valuation', 'Industry', 'City', 'Country/Region', 'Continent'],
+    'valuation_maps': ['Valuation', 'Date Joined', 'Country/Region', 'Continent'],
+    'missing_values': COLUMNS,
+    'investors': ['Company', 'Valuation', 'Select Investors'],
+}
+
+
+def columns_for(analysis=None, columns=None):
+    """Return the raw CSV columns to read for ``analysis`` and/or explicit ``columns``.
+
+    Both arguments may be given; their union is returned in file order. With
+    neither, every column is read.
+    """
+    if analysis is None and columns is None:
+        return list(COLUMNS)
+    wanted = set(columns or [])
+    if analysis is not None:
+        try:
+            wanted.update(ANALYSES[analysis])
+        except KeyError:
+            raise ValueError(f"unknown analysis {analysis!r}; expected one of {sorted(ANALYSES)}") from None
+    unknown = wanted.difference(COLUMNS)
+    if unknown:
+        raise ValueError(f"unknown columns: {sorted(unknown)}")
+    return [column for column in COLUMNS if column in wanted]
+
+
+def stage(tracer, name, rows_in=None):
+    """``tracer.stage(name)`` of a ``stages.Tracer``, or a no-op context without a tracer."""
+    return tracer.stage(name, rows_in=rows_in) if tracer is not None else nullcontext()
+
+
+def clean_companies(df, date_format=DATE_FORMAT, tracer=None):
+    """Add the derived columns to a frame read with ``SCHEMA`` (or a plain ``read_csv``).
+
+    * ``Date Joined`` is parsed to datetime64 (NaT where missing) and
+      ``Year Joined`` added as nullable ``Int16`` (missing where the date is).
+    * ``valuation_num`` and ``funding_num`` hold the money columns in billions,
+      with NaN where the source says ``Unknown``.
+
+    The frame is modified in place and returned. With ``tracer`` (a
+    ``stages.Tracer``) date and money parsing are recorded as the stages
+    ``parse_dates`` and ``parse_money``.
+    """
+    if 'Date Joined' in df and not pd.api.types.is_datetime64_any_dtype(df['Date Joined']):
+        with stage(tracer, 'parse_dates', rows_in=len(df)):
+            df['Date Joined'], df['Year Joined'] = parse_dates_with_year(df['Date Joined'], format=date_format)
+    if 'Valuation' in df or 'Funding' in df:
+        with stage(tracer, 'parse_money', rows_in=len(df)):
+            if 'Valuation' in df:
+                df['valuation_num'] = parse_money(df['Valuation'], unit=BILLION)
+            if 'Funding' in df:
+                df['funding_num'] = parse_money(df['Funding'], unit=BILLION)
+    return df
+
+
+def read_companies_csv(path=COMPANIES_CSV, usecols=None, **kwargs):
+    """Call ``read_csv`` with the typed schema restricted to ``usecols``."""
+    usecols = list(COLUMNS) if usecols is None else list(usecols)
+    dtype = {column: SCHEMA[column] for column in usecols if column in SCHEMA}
+    return pd.read_csv(path, usecols=usecols, dtype=dtype, **kwargs)
+
+
+def load_companies(path=COMPANIES_CSV, analysis=None, columns=None, dictionaries=None, tracer=None):
+    """Load the companies table with the typed schema and derived columns.
+
+    ``analysis`` names an entry of ``ANALYSES`` and ``columns`` lists raw CSV
+    columns; only their union is read from disk. With ``dictionaries`` (a
+    ``dictionaries.DictionarySet``) the ``CATEGORY_COLUMNS`` are encoded with
+    its global dictionaries, so their codes are stable across files. With
+    ``tracer`` (a ``stages.Tracer``) each step is recorded as a stage:
+    ``read_csv``, ``parse_dates``, ``parse_money`` and ``encode``.
+
+    Example:
+
+     [IN]:  load_companies(analysis='national_valuations').dtypes
+    [OUT]:  Valuation         category
+            Country/Region    category
+            valuation_num      float64
+            dtype: object
+    """
+    usecols = columns_for(analysis, columns)
+    with stage(tracer, 'read_csv') as record:
+        df = read_companies_csv(path, usecols=usecols)
+        if record is not None:
+            record.rows_out = len(df)
+    df = clean_companies(df, tracer=tracer)
+    if dictionaries is not None:
+        with stage(tracer, 'encode', rows_in=len(df)):
+            dictionaries.encode_frame(df)
+    return df
+
+
+def memory_per_row(df):
+    """Return the deep memory footprint of ``df`` in bytes per row."""
+    if not len(df):
+        return 0.0
+    return float(df.memory_usage(deep=True, index=False).sum()) / len(df)
+
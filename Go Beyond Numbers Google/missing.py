@@ -0,0 +1,137 @@
+"""Single-pass missing-data profile of the companies table.
+
+The activity counts missing values with ``df.isna()``, then
+``pd.get_dummies(..., dummy_na=True).sum()``, then a second
+``isna().any(axis=1)`` mask, materializing several full-size boolean frames
+and a wide dummy frame. ``MissingProfile`` looks at one column at a time and
+keeps only
+
+* the null count per column,
+* one packed integer per row whose bit ``i`` is set when column ``i`` is
+  missing (so ``row_flags != 0`` is the ``any(axis=1)`` mask), and
+* the number of rows per distinct missingness pattern, from which the
+  co-missingness of every pair of columns is derived.
+
+Chunks of a larger file can be fed one after another with ``update``.
+
+Example:
+
+    profile = profile_frame(df_companies)
+    profile.null_counts()
+    df_companies[profile.any_missing()]
+    profile.co_missing()
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def null_mask(series):
+    """Return the null mask of one column as a boolean array."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy() < 0
+    return series.isna().to_numpy()
+
+
+def _flag_dtype(n_columns):
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_columns <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"cannot pack {n_columns} columns into one integer per row")
+
+
+class MissingProfile:
+    """Accumulates null counts, per-row null bitmasks and missingness patterns."""
+
+    def __init__(self, columns, keep_rows=True):
+        self.columns = list(columns)
+        self.dtype = _flag_dtype(len(self.columns))
+        self.keep_rows = keep_rows
+        self.n_rows = 0
+        self._null_counts = np.zeros(len(self.columns), dtype=np.int64)
+        self._patterns = {}
+        self._row_flags = []
+
+    def update(self, df):
+        """Add the rows of ``df`` (a chunk with the profile's columns) to the profile."""
+        flags = np.zeros(len(df), dtype=self.dtype)
+        for bit, column in enumerate(self.columns):
+            mask = null_mask(df[column])
+            self._null_counts[bit] += np.count_nonzero(mask)
+            flags |= mask.astype(self.dtype) << self.dtype(bit)
+        patterns, counts = np.unique(flags[flags != 0], return_counts=True)
+        for pattern, count in zip(patterns.tolist(), counts.tolist()):
+            self._patterns[pattern] = self._patterns.get(pattern, 0) + count
+        if self.keep_rows:
+            self._row_flags.append(flags)
+        self.n_rows += len(df)
+        return self
+
+    def null_counts(self):
+        """Missing values per column, like ``df.isna().sum()``."""
+        return pd.Series(self._null_counts, index=self.columns)
+
+    def row_flags(self):
+        """Per-row packed null bitmask; bit ``i`` is set when ``columns[i]`` is missing."""
+        if not self.keep_rows:
+            raise ValueError("profile was built with keep_rows=False")
+        if len(self._row_flags) != 1:
+            self._row_flags = [np.concatenate(self._row_flags or [np.zeros(0, dtype=self.dtype)])]
+        return self._row_flags[0]
+
+    def any_missing(self):
+        """Boolean row mask of rows with at least one missing value (``isna().any(axis=1)``)."""
+        return self.row_flags() != 0
+
+    def rows_with_missing(self):
+        """Number of rows with at least one missing value."""
+        return sum(self._patterns.values())
+
+    def patterns(self):
+        """Rows per missingness pattern, indexed by the tuple of missing columns."""
+        items = sorted(self._patterns.items(), key=lambda item: -item[1])
+        index = [tuple(self.decode(pattern)) for pattern, _ in items]
+        return pd.Series([count for _, count in items], index=index, dtype=np.int64)
+
+    def decode(self, pattern):
+        """Return the column names whose bits are set in ``pattern``."""
+        return [column for bit, column in enumerate(self.columns) if pattern >> bit & 1]
+
+    def co_missing(self):
+        """Pairs of columns that are missing in the same rows, with their row counts.
+
+        Returns a frame with columns ``column_a``, ``column_b`` and ``rows``,
+        sorted by ``rows`` descending. Pairs that never co-occur are omitted.
+        """
+        pairs = {}
+        for pattern, count in self._patterns.items():
+            missing = self.decode(pattern)
+            for i, column_a in enumerate(missing):
+                for column_b in missing[i + 1:]:
+                    pairs[column_a, column_b] = pairs.get((column_a, column_b), 0) + count
+        frame = pd.DataFrame(
+            [(a, b, rows) for (a, b), rows in pairs.items()],
+            columns=['column_a', 'column_b', 'rows'],
+        )
+        return frame.sort_values('rows', ascending=False, ignore_index=True)
+
+
+def profile_frame(df, keep_rows=True):
+    """Profile the missing values of ``df`` in one pass over its columns."""
+    return MissingProfile(df.columns, keep_rows=keep_rows).update(df)
+
+
+def profile_chunks(chunks, columns=None, keep_rows=False):
+    """Profile an iterable of frames, e.g. ``pd.read_csv(..., chunksize=...)``.
+
+    ``columns`` defaults to the columns of the first chunk. Per-row flags are
+    only kept when ``keep_rows`` is true, so memory stays constant by default.
+    """
+    profile = None
+    for chunk in chunks:
+        if profile is None:
+            profile = MissingProfile(columns if columns is not None else chunk.columns, keep_rows=keep_rows)
+        profile.update(chunk)
+    if profile is None:
+        profile = MissingProfile(columns or [], keep_rows=keep_rows)
+    return profile
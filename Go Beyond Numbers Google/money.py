@@ -0,0 +1,51 @@
+"""Vectorized parsing of money strings such as ``$180B``, ``$500M`` or ``Unknown``.
+
+The activity converts ``Valuation`` with ``Series.apply(str_to_num)``, which
+calls Python once per row and only understands a ``$...B`` suffix. The helpers
+here factorize the column first, parse each distinct string once and broadcast
+the result back through the integer codes, so the per-row work is a single
+hash pass plus a ``take``.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Multipliers for the unit suffixes found in the unicorn exports.
+UNITS = {"": 1.0, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+BILLION = 1e9
+MILLION = 1e6
+
+_MONEY_PATTERN = r"^\s*\$?\s*(?P<amount>[0-9][0-9,]*(?:\.[0-9]+)?)\s*(?P<suffix>[KkMmBbTt]?)\s*$"
+
+
+def parse_unique_money(uniques, unit=BILLION):
+    """Parse an array of distinct money strings into float64 amounts of ``unit`` dollars.
+
+    Strings that do not look like money (``Unknown``, empty strings, ...) become NaN.
+    """
+    parts = pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str).str.extract(_MONEY_PATTERN)
+    amounts = pd.to_numeric(parts["amount"].str.replace(",", "", regex=False), errors="coerce")
+    multipliers = parts["suffix"].fillna("").str.upper().map(UNITS)
+    return (amounts * multipliers / unit).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def parse_money(values, unit=BILLION):
+    """Convert money strings into a float64 array of amounts expressed in ``unit`` dollars.
+
+    ``values`` may be a Series, an array or any sequence of strings. Missing
+    values and unparseable strings such as ``Unknown`` map to NaN, so the
+    output can be used directly as a nullable numeric column.
+
+    Example:
+
+     [IN]:  parse_money(pd.Series(['$4B', '$500M', 'Unknown']))
+    [OUT]:  array([4. , 0.5, nan])
+    """
+    if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+        values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = parse_unique_money(uniques, unit=unit)
+    # Code -1 marks a missing value; appending NaN lets ``take`` resolve it
+    # to the last slot without a separate masking pass.
+    return np.append(parsed, np.nan).take(codes)
@@ -0,0 +1,253 @@
+"""Multi-core execution of the activity's reductions over a process pool.
+
+``ParallelEngine`` copies the numeric columns and the codes of the
+categorical columns of a companies frame into ``multiprocessing.shared_memory``
+blocks once. Worker processes attach to those blocks when they start, so tasks
+only carry a row range and the few parameters of the reduction; no frame is
+ever pickled. String columns such as ``Company`` are not shared; only their
+null masks are, which is all the missing-value counts need.
+
+Counts and masks are computed over fixed partitions of ``partition_rows``
+rows and combined in partition order; integer results do not depend on how
+rows are split. Floating-point sums do: pandas adds each group's values in
+table order with compensated (Kahan) summation, and per-partition partial
+sums would round differently. ``group_sum`` therefore splits the groups,
+not the rows, between the workers, and each worker runs pandas' own kernel
+over its groups' rows in table order, so every sum is bit-for-bit equal to
+the serial ``groupby`` whatever the number of workers. A single large group
+is summed by one worker, which bounds the speedup on skewed keys.
+
+Example:
+
+    with ParallelEngine(df_companies, workers=8) as engine:
+        national_valuations = engine.group_sum('Country/Region', 'valuation_num')
+        mask = engine.isin('City', ['Beijing', 'San Francisco', 'London'])
+        nulls = engine.null_counts()
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+PARTITION_ROWS = 1_000_000
+
+# Column kinds stored in shared memory.
+NUMERIC = "numeric"
+CATEGORICAL = "categorical"
+NULLMASK = "nullmask"
+
+# Name of the shared boolean output column written by ``isin``.
+_MASK = "__mask__"
+
+# Arrays attached by each worker process, keyed by column name, and the
+# blocks backing them (kept referenced so the mappings stay valid).
+_WORKER_COLUMNS = {}
+_WORKER_BLOCKS = []
+
+
+def _share(array):
+    """Copy ``array`` into a new shared memory block and return (block, view)."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, view
+
+
+def _attach(spec):
+    name, dtype, shape = spec
+    block = shared_memory.SharedMemory(name=name)
+    _WORKER_BLOCKS.append(block)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(specs):
+    _WORKER_COLUMNS.clear()
+    for column, spec in specs.items():
+        _WORKER_COLUMNS[column] = _attach(spec)
+
+
+def _group_count_task(columns, by, value, n_groups, start, stop):
+    codes = columns[by][start:stop]
+    values = columns[value][start:stop]
+    keyed = codes >= 0
+    valid = keyed & ~np.isnan(values)
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    rows = np.bincount(codes[keyed], minlength=n_groups)
+    return counts, rows
+
+
+def _group_sum_task(columns, by, value, first, stop):
+    """Sum ``value`` for the groups with codes in ``[first, stop)``, over the whole table."""
+    codes = columns[by]
+    selected = (codes >= first) & (codes < stop)
+    # The groupby kernel sees each group's rows in table order, so it rounds
+    # exactly as the serial ``groupby(by)[value].sum()`` does.
+    sums = pd.Series(columns[value][selected]).groupby(codes[selected]).sum()
+    out = np.zeros(stop - first, dtype=np.float64)
+    out[sums.index.to_numpy() - first] = sums.to_numpy(dtype=np.float64)
+    return out
+
+
+def _isin_task(columns, column, targets, out, start, stop):
+    columns[out][start:stop] = np.isin(columns[column][start:stop], targets)
+    return None
+
+
+def _null_count_task(columns, kinds, start, stop):
+    counts = {}
+    for column, kind in kinds.items():
+        values = columns[column][start:stop]
+        if kind == CATEGORICAL:
+            counts[column] = int(np.count_nonzero(values < 0))
+        elif kind == NULLMASK:
+            counts[column] = int(np.count_nonzero(values))
+        elif values.dtype.kind == "f":
+            counts[column] = int(np.count_nonzero(np.isnan(values)))
+        else:
+            counts[column] = 0
+    return counts
+
+
+_TASKS = {
+    "group_count": _group_count_task,
+    "group_sum": _group_sum_task,
+    "isin": _isin_task,
+    "null_count": _null_count_task,
+}
+
+
+def _run_task(task):
+    name, args, start, stop = task
+    return _TASKS[name](_WORKER_COLUMNS, *args, start, stop)
+
+
+class ParallelEngine:
+    """Run partitioned reductions of a companies frame on a process pool.
+
+    ``df`` is typically the output of ``loader.load_companies``. Categorical
+    and numeric columns are shared as arrays; any other column is shared as
+    its null mask. Use the engine as a context manager, or call ``close()``,
+    to stop the pool and release the shared memory.
+    """
+
+    def __init__(self, df, workers=None, partition_rows=PARTITION_ROWS):
+        self.n_rows = len(df)
+        self.partition_rows = partition_rows
+        self.workers = workers or os.cpu_count() or 1
+        self.kinds = {}
+        self.categories = {}
+        self._blocks = []
+        self._arrays = {}
+        self._specs = {}
+        for column in df.columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self.kinds[column] = CATEGORICAL
+                self.categories[column] = series.cat.categories
+                array = series.cat.codes.to_numpy()
+            elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                self.kinds[column] = NUMERIC
+                array = series.to_numpy()
+            else:
+                self.kinds[column] = NULLMASK
+                array = series.isna().to_numpy()
+            self._add_array(column, np.ascontiguousarray(array))
+        # Output buffer the workers write ``isin`` results into.
+        self._add_array(_MASK, np.zeros(self.n_rows, dtype=bool))
+        self._pool = None
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(dict(self._specs),)
+            )
+
+    def _add_array(self, column, array):
+        block, view = _share(array)
+        self._blocks.append(block)
+        self._arrays[column] = view
+        self._specs[column] = (block.name, array.dtype.str, array.shape)
+
+    def partitions(self):
+        """Return the ``(start, stop)`` row ranges the reductions run over."""
+        return [(start, min(start + self.partition_rows, self.n_rows))
+                for start in range(0, self.n_rows, self.partition_rows)]
+
+    def group_ranges(self, rows):
+        """Split groups with ``rows`` rows each into at most ``workers`` code ranges of similar size."""
+        targets = np.arange(1, self.workers) * rows.sum() / self.workers
+        bounds = np.unique(np.r_[0, np.searchsorted(np.cumsum(rows), targets, side='right'), len(rows)])
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def _map(self, name, args, ranges=None):
+        ranges = self.partitions() if ranges is None else ranges
+        tasks = [(name, args, start, stop) for start, stop in ranges]
+        if self._pool is None:
+            return [_TASKS[name](self._arrays, *args, start, stop) for _, args, start, stop in tasks]
+        return list(self._pool.map(_run_task, tasks))
+
+    def _require(self, column, kind):
+        if self.kinds.get(column) != kind:
+            raise ValueError(f"column {column!r} is not {kind} in this engine")
+
+    def group_agg(self, by, value):
+        """Return per-group ``sum`` and ``count`` of numeric ``value`` grouped by categorical ``by``.
+
+        Only observed groups are returned, in category order, like
+        ``groupby(by)[value].agg(['sum', 'count'])`` on the source frame.
+        """
+        self._require(by, CATEGORICAL)
+        self._require(value, NUMERIC)
+        n_groups = len(self.categories[by])
+        counts = np.zeros(n_groups, dtype=np.int64)
+        rows = np.zeros(n_groups, dtype=np.int64)
+        for part_counts, part_rows in self._map("group_count", (by, value, n_groups)):
+            counts += part_counts
+            rows += part_rows
+        ranges = self.group_ranges(rows)
+        sums = np.concatenate([np.zeros(0)] + self._map("group_sum", (by, value), ranges))
+        present = rows > 0
+        index = pd.Index(self.categories[by], name=by)
+        return pd.DataFrame({'sum': sums, 'count': counts}, index=index)[present]
+
+    def group_sum(self, by, value):
+        """Parallel ``df.groupby(by, observed=True)[value].sum()``, bit-for-bit equal to it.
+
+        Groups, not rows, are split between the workers (see the module
+        docstring).
+        """
+        return self.group_agg(by, value)['sum'].rename(value)
+
+    def isin(self, column, values):
+        """Parallel ``df[column].isin(values)`` for a categorical column, as a boolean array."""
+        self._require(column, CATEGORICAL)
+        targets = self.categories[column].get_indexer(pd.Index(list(values)))
+        targets = targets[targets >= 0].astype(self._arrays[column].dtype)
+        self._map("isin", (column, targets, _MASK))
+        return self._arrays[_MASK].copy()
+
+    def null_counts(self):
+        """Return the number of missing values per source column, like ``df.isna().sum()``."""
+        totals = dict.fromkeys(self.kinds, 0)
+        for counts in self._map("null_count", (self.kinds,)):
+            for column, count in counts.items():
+                totals[column] += count
+        return pd.Series(totals, dtype=np.int64)
+
+    def close(self):
+        """Stop the worker pool and release the shared memory blocks."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
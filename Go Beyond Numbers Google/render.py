@@ -0,0 +1,155 @@
+"""Headless batch rendering of the investor report figures.
+
+The activity draws the valuation barplot and the geo map interactively. This
+module renders any number of figure variants to files without a display:
+
+* each job is a small, already aggregated frame plus drawing parameters, so
+  sending it to a worker process is cheap;
+* jobs run on a process pool, one matplotlib ``Agg`` figure per worker that
+  is cleared and reused for every barplot instead of being recreated;
+* seaborn/matplotlib figures are written as PNG or SVG, plotly maps as HTML
+  (PNG/SVG for maps needs the optional ``kaleido`` package);
+* the wall time of every figure is returned.
+
+Example:
+
+    jobs = valuation_bar_jobs(df_companies, group_by='Continent')
+    jobs += map_jobs(MapRenderer(df_companies))
+    timings = render_batch(jobs, 'report', workers=8)
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.io as pio  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+from maps import MAP_SPECS  # noqa: E402
+from topn import BIG_FOUR, top_n  # noqa: E402
+
+FigureJob = namedtuple('FigureJob', ['name', 'kind', 'data', 'params', 'formats'])
+
+BAR = 'bar'
+GEO = 'geo'
+
+FIGSIZE = (12, 8)
+
+# The figure reused by every barplot rendered in this process.
+_FIGURE = None
+
+
+def _reusable_figure():
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.figure(figsize=FIGSIZE)
+    _FIGURE.clear()
+    return _FIGURE
+
+
+def _render_bar(job, path_stem):
+    fig = _reusable_figure()
+    ax = fig.add_subplot()
+    x, y = job.params['x'], job.params['y']
+    # ``hue=x`` keeps one viridis colour per bar, as ``palette=`` alone did
+    # before seaborn 0.13.
+    sns.barplot(data=job.data, x=x, y=y, hue=x, palette='viridis', legend=False,
+                errorbar=None, ax=ax)
+    ax.set_title(job.params.get('title', job.name))
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    paths = []
+    for fmt in job.formats:
+        paths.append(f"{path_stem}.{fmt}")
+        fig.savefig(paths[-1], format=fmt)
+    return paths
+
+
+def _render_geo(job, path_stem):
+    fig = pio.from_json(job.data)
+    paths = []
+    for fmt in job.formats:
+        paths.append(f"{path_stem}.{fmt}")
+        if fmt == 'html':
+            fig.write_html(paths[-1], include_plotlyjs='cdn')
+        else:
+            fig.write_image(paths[-1], format=fmt)
+    return paths
+
+
+_RENDERERS = {BAR: _render_bar, GEO: _render_geo}
+
+
+def render_job(job, out_dir):
+    """Render one job into ``out_dir``. Returns ``(name, paths, seconds, error)``."""
+    start = time.perf_counter()
+    try:
+        paths = _RENDERERS[job.kind](job, os.path.join(out_dir, job.name))
+        error = None
+    except Exception as exc:  # reported per figure so one failure does not stop the batch
+        paths, error = [], f"{type(exc).__name__}: {str(exc).strip()}"
+    return job.name, paths, time.perf_counter() - start, error
+
+
+def render_batch(jobs, out_dir, workers=None):
+    """Render ``jobs`` into ``out_dir`` on ``workers`` processes (1 renders in-process).
+
+    Returns a frame with one row per figure: ``name``, ``paths``, ``seconds``
+    and ``error`` (None on success).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [render_job(job, out_dir) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_job, jobs, [out_dir] * len(jobs)))
+    return pd.DataFrame(results, columns=['name', 'paths', 'seconds', 'error'])
+
+
+def _slug(text):
+    return ''.join(ch if ch.isalnum() else '_' for ch in str(text).lower()).strip('_')
+
+
+def valuation_bar_jobs(df, group_by=None, n=20, exclude=BIG_FOUR, formats=('png',)):
+    """Barplot jobs of the top-``n`` countries by total valuation.
+
+    With ``group_by`` (e.g. ``'Continent'`` or ``'Industry'``) one job is
+    made per group value; otherwise a single job covers the whole table, as
+    in the activity.
+    """
+    groups = [(None, df)] if group_by is None else df.groupby(group_by, observed=True)
+    jobs = []
+    names = set()
+    for value, rows in groups:
+        totals = rows.groupby('Country/Region', observed=True)['valuation_num'].sum()
+        data = top_n(totals, n, exclude).reset_index()
+        data['Country/Region'] = data['Country/Region'].astype(str)
+        if data.empty:
+            continue
+        suffix = '' if value is None else f"_{_slug(group_by)}_{_slug(value)}"
+        name = f"valuation_bar{suffix}"
+        # Values that differ only in case or punctuation (the data has both
+        # "Artificial intelligence" and "Artificial Intelligence") must not
+        # overwrite each other's files.
+        while name in names:
+            name += "_"
+        names.add(name)
+        title = "Top countries by valuation" + ('' if value is None else f" ({value})")
+        jobs.append(FigureJob(name, BAR, data,
+                              {'x': 'Country/Region', 'y': 'valuation_num', 'title': title}, tuple(formats)))
+    return jobs
+
+
+def map_jobs(renderer, specs=None, formats=('html',)):
+    """Geo map jobs for ``specs`` of a ``maps.MapRenderer``, carrying the cached figure JSON."""
+    specs = MAP_SPECS.values() if specs is None else specs
+    return [FigureJob(f"map_{spec.name}", GEO, renderer.figure_json(spec), {}, tuple(formats))
+            for spec in specs]
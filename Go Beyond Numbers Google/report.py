@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""Produce the investor deliverables of the activity in one non-interactive run.
+
+Runs load -> clean -> filter -> aggregate -> render once and writes:
+
+1. ``hardware_companies.csv``: hardware companies in Beijing, San Francisco or London
+2. ``ai_london_companies.csv``: artificial intelligence companies in London
+3. ``top20_countries.csv`` and ``valuation_bar.png``: top 20 countries by total
+   valuation, excluding the United States, China, India and the United Kingdom
+4. ``map_joined_after_2020.html``: valuation map of companies that joined after 2020
+5. ``map_no_big4.html`` and ``map_europe.html``: valuation maps without the big four,
+   worldwide and for Europe
+
+Compared with the notebook:
+
+* display-only steps (``head``, ``info``, ``describe``, ...) are skipped;
+* the cleaned table, filter index and country aggregates are built once and
+  shared by every deliverable;
+* the categorical columns are encoded with the global dictionaries kept in
+  the cache directory, so their codes match earlier runs;
+* the filtered rows, top countries and figure data are kept in a
+  ``results.ResultCache`` keyed by the source file's digest, so a repeated
+  run for unchanged data writes the deliverables without loading the table
+  (``--recompute`` discards them);
+* the wall time, CPU time, memory and row counts of each stage are printed,
+  and written as a JSON trace with ``--trace``; ``--baseline`` compares
+  against an earlier trace.
+
+Usage:
+
+    python report.py --source Unicorn_Companies.csv --out report --trace trace.json
+    python report.py --baseline trace.json --threshold 0.2
+"""
+
+import argparse
+import os
+import sys
+
+from dictionaries import DictionarySet
+from filter_index import FilterIndex
+from loader import COMPANIES_CSV, load_companies
+from maps import MapRenderer
+from render import map_jobs, render_batch, valuation_bar_jobs
+from results import RESULTS_DIR, ResultCache
+from stages import Tracer, compare, load_trace
+from table_cache import load_cached_companies, source_digest
+from topn import BIG_FOUR, top_n
+
+HARDWARE_CITIES = ['Beijing', 'San Francisco', 'London']
+
+# The source data spells this industry both ways.
+AI_INDUSTRY = ['Artificial intelligence', 'Artificial Intelligence']
+
+COMPANY_COLUMNS = ['Company', 'Valuation', 'Date Joined', 'Industry', 'City', 'Country/Region', 'Continent',
+                   'Year Founded', 'Funding', 'Select Investors']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=COMPANIES_CSV, help="companies CSV (default: %(default)s)")
+    parser.add_argument("--out", default="report", help="output directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="always parse the CSV instead of the Parquet cache")
+    parser.add_argument("--recompute", action="store_true",
+                        help="discard the cached results and compute them again")
+    parser.add_argument("--workers", type=int, default=None, help="figure rendering processes (default: CPU count)")
+    parser.add_argument("--formats", default="png", help="barplot formats, comma-separated (default: %(default)s)")
+    parser.add_argument("--trace", help="write the per-stage JSON trace to this file")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also trace allocations with tracemalloc (slows the stages down)")
+    parser.add_argument("--baseline", help="trace of a previous run; exit with status 2 if a stage slowed down")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slowdown per stage with --baseline (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def report_queries(formats):
+    """``{name: (operation, params)}`` of the report's results, as keyed in the ``ResultCache``."""
+    return {
+        'hardware': ('rows', {'Industry': 'Hardware', 'City': HARDWARE_CITIES, 'columns': COMPANY_COLUMNS}),
+        'ai_london': ('rows', {'Industry': AI_INDUSTRY, 'City': 'London', 'columns': COMPANY_COLUMNS}),
+        'top20': ('top_n', {'by': 'Country/Region', 'n': 20, 'exclude': sorted(BIG_FOUR)}),
+        'figures': ('figure_jobs', {'formats': formats}),
+    }
+
+
+def run(args, tracer, results):
+    """Run the pipeline, recording each stage in ``tracer``. Returns the number of failed figures.
+
+    Results found in ``results`` for the current version of ``--source`` are
+    reused; the table is only loaded if one of them is missing.
+    """
+    os.makedirs(args.out, exist_ok=True)
+    formats = tuple(fmt.strip() for fmt in args.formats.split(",") if fmt.strip())
+
+    with tracer.stage("lookup") as stage:
+        version = source_digest(args.source)
+        queries = report_queries(formats)
+        cached = {name: results.get(version, *query) for name, query in queries.items()}
+        stage.rows_out = sum(value is not None for value in cached.values())
+
+    def result(name, compute):
+        if cached[name] is not None:
+            return cached[name]
+        return results.put(version, *queries[name], compute())
+
+    df_companies = None
+    if any(value is None for value in cached.values()):
+        with tracer.stage("load") as stage:
+            dictionaries = DictionarySet.load()
+            if args.no_cache:
+                df_companies = load_companies(args.source, dictionaries=dictionaries, tracer=tracer)
+            else:
+                df_companies = load_cached_companies(args.source, dictionaries=dictionaries, tracer=tracer)
+            dictionaries.save()
+            stage.rows_out = len(df_companies)
+
+        with tracer.stage("index", rows_in=len(df_companies)):
+            index = FilterIndex(df_companies)
+
+    # Stages served entirely from the cache read no rows of the table.
+    rows_in = None if df_companies is None else len(df_companies)
+
+    def rows(name):
+        params = queries[name][1]
+        filters = {column: values for column, values in params.items() if column != 'columns'}
+        return result(name, lambda: df_companies.iloc[index.rows(filters)][params['columns']])
+
+    with tracer.stage("filter", rows_in=rows_in) as stage:
+        hardware = rows('hardware')
+        ai_london = rows('ai_london')
+        hardware.to_csv(os.path.join(args.out, "hardware_companies.csv"), index=False)
+        ai_london.to_csv(os.path.join(args.out, "ai_london_companies.csv"), index=False)
+        stage.rows_out = len(hardware) + len(ai_london)
+
+    with tracer.stage("aggregate", rows_in=rows_in) as stage:
+        top20 = result('top20', lambda: top_n(
+            df_companies.groupby('Country/Region', observed=True)['valuation_num'].sum(), 20, exclude=BIG_FOUR))
+        top20.reset_index().to_csv(os.path.join(args.out, "top20_countries.csv"), index=False)
+        stage.rows_out = len(top20)
+
+    with tracer.stage("render") as stage:
+        jobs = result('figures', lambda: valuation_bar_jobs(df_companies, formats=formats)
+                      + map_jobs(MapRenderer(df_companies)))
+        figures = render_batch(jobs, args.out, workers=args.workers)
+        stage.rows_out = len(figures)
+
+    print(f"hardware companies: {len(hardware)}, AI companies in London: {len(ai_london)}")
+    for row in figures.itertuples():
+        status = "ok" if row.error is None else row.error
+        print(f"  {row.name:<28} {row.seconds * 1e3:8.1f} ms  {status}")
+    return int(figures['error'].notna().sum())
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracer = Tracer(trace_memory=args.trace_memory, source=args.source)
+    results = ResultCache(cache_dir=RESULTS_DIR)
+    if args.recompute:
+        results.clear(disk=True)
+    with tracer.stage("total"):
+        failed = run(args, tracer, results)
+    stats = results.stats()
+    print(f"results: {stats.hits} cached ({stats.disk_hits} from disk), {stats.misses} computed")
+    print(tracer.summary())
+    if args.trace:
+        tracer.to_json(args.trace)
+    status = 1 if failed else 0
+    if args.baseline:
+        regressions = compare(load_trace(args.baseline), tracer.as_dict(), args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {old * 1e3:.1f} ms -> {new * 1e3:.1f} ms ({ratio:.2f}x)")
+        status = status or (2 if regressions else 0)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Memoized analysis results, in an LRU memory tier and an optional disk tier.
+
+The same questions come back again and again (top countries, city filters,
+AI companies in London, companies that joined after 2020), each time with
+slightly different parameters, and each used to be recomputed from the full
+table. ``ResultCache`` keeps their results keyed by
+``(dataset version, operation, parameters)``:
+
+* the memory tier is an LRU bounded by the approximate size of the results
+  in bytes (``memory_usage(deep=True)`` for pandas objects, the pickled size
+  otherwise); the least recently used results are evicted first, and a
+  result larger than the whole budget is not kept in memory;
+* with ``cache_dir`` every result is also pickled to disk (written to a
+  temporary file and renamed), so a later process is served without
+  loading the table; a disk hit is promoted to the memory tier;
+* ``stats()`` returns the hit, miss and eviction counts.
+
+The dataset version is whatever identifies the input, usually
+``table_cache.source_digest(path)``, which is remembered by size and
+modification time and so costs no read of the table. Parameters are
+normalized before hashing (dict keys sorted, sets sorted, tuples as lists),
+so ``{'City': 'London', 'Industry': x}`` and ``{'Industry': x, 'City':
+'London'}`` are the same key. Cached results are shared between callers and
+must not be modified.
+
+Example:
+
+    results = ResultCache(max_bytes=256 * 2**20, cache_dir=RESULTS_DIR)
+    version = source_digest('Unicorn_Companies.csv')
+    top20 = results.get_or_compute(version, 'top_n', {'n': 20, 'exclude': BIG_FOUR},
+                                   lambda: top_n(national_valuations(), 20, BIG_FOUR))
+    print(results.stats())
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from table_cache import CACHE_DIR
+
+RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+
+MAX_BYTES = 256 * 2**20
+
+CACHE_VERSION = 1
+
+CacheStats = namedtuple('CacheStats', ['hits', 'disk_hits', 'misses', 'evictions', 'entries', 'bytes'])
+
+_MISSING = object()
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(item) for item in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def result_key(version, operation, params=None):
+    """Return the hex key of ``operation`` with ``params`` on dataset ``version``."""
+    text = json.dumps([CACHE_VERSION, version, operation, _normalize(params or {})], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+def result_nbytes(value):
+    """Approximate in-memory size of a cached result in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class ResultCache:
+    """Results of analysis operations, LRU-bounded to ``max_bytes`` in memory and optionally kept on disk."""
+
+    def __init__(self, max_bytes=MAX_BYTES, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()  # key -> (value, nbytes), least recently used first
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"result-{key}.pkl")
+
+    def _remember(self, key, value):
+        nbytes = result_nbytes(value)
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def get(self, version, operation, params=None, default=None):
+        """Return the cached result, or ``default`` if neither tier has it."""
+        key = result_key(version, operation, params)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+        if self.cache_dir is not None:
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return default
+
+    def put(self, version, operation, params, value):
+        """Store ``value`` as the result of ``operation`` with ``params`` on ``version``."""
+        key = result_key(version, operation, params)
+        self._remember(key, value)
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            # Write to a temporary name first so a concurrent reader never
+            # sees a half-written file under the final name.
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        return value
+
+    def get_or_compute(self, version, operation, params, compute):
+        """Return the cached result, calling ``compute()`` and storing its result on a miss."""
+        value = self.get(version, operation, params, default=_MISSING)
+        if value is _MISSING:
+            value = self.put(version, operation, params, compute())
+        return value
+
+    def clear(self, disk=False):
+        """Empty the memory tier, and with ``disk`` also remove the cached files."""
+        self._entries.clear()
+        self.nbytes = 0
+        if disk and self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("result-"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """Return a ``CacheStats``; ``hits`` includes ``disk_hits``."""
+        return CacheStats(self.hits, self.disk_hits, self.misses, self.evictions, len(self._entries), self.nbytes)
@@ -0,0 +1,120 @@
+"""Concurrent loading of companies data split into many CSV shards.
+
+Production data arrives as one CSV per region or day. Reading the shards
+one after another leaves the disk idle while a shard is parsed, and leaves
+the CPU idle while the next one is read. ``load_shards_async`` instead:
+
+* reads the shards on worker threads (``asyncio.to_thread``), at most
+  ``max_concurrency`` at a time, and parses each with the typed schema of
+  ``loader.read_companies_csv``; pandas' C parser releases the GIL, so
+  several shards parse at once;
+* encodes every shard's categorical columns with one ``DictionarySet``,
+  in shard order on the event loop, so all shards share the same
+  categories and the same codes whatever order the reads finish in;
+* concatenates the typed shards once at the end, column by column (shared
+  categories make the categorical columns a concatenation of int codes),
+  and parses the money and date columns once, through their distinct
+  values.
+
+Example:
+
+    df_companies = load_shards(shard_paths('data/unicorns-*.csv'), max_concurrency=16)
+
+or, from async code:
+
+    df_companies = await load_shards_async(paths, analysis='national_valuations')
+"""
+
+import asyncio
+import glob
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dictionaries import DictionarySet
+from loader import clean_companies, columns_for, read_companies_csv
+
+MAX_CONCURRENCY = 8
+
+SHARD_COLUMN = 'Shard'
+
+
+def shard_paths(pattern):
+    """Return the files matching ``pattern`` in sorted order."""
+    return sorted(glob.glob(pattern))
+
+
+def _read_shard(path, usecols):
+    with open(path, 'rb') as f:
+        return read_companies_csv(f, usecols=usecols)
+
+
+async def read_shards_async(paths, usecols=None, max_concurrency=MAX_CONCURRENCY):
+    """Read raw typed shards concurrently; returns the frames in ``paths`` order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def read(path):
+        async with semaphore:
+            return await asyncio.to_thread(_read_shard, path, usecols)
+
+    return await asyncio.gather(*(read(path) for path in paths))
+
+
+async def load_shards_async(paths, analysis=None, columns=None, max_concurrency=MAX_CONCURRENCY,
+                            dictionaries=None, with_shard=False):
+    """Load and clean the shards at ``paths`` into one companies table.
+
+    ``analysis`` / ``columns`` select the raw columns as in
+    ``loader.load_companies``. ``dictionaries`` (default: a new in-memory
+    ``DictionarySet``) encodes the categorical columns; pass a persisted set
+    to keep codes stable between runs. With ``with_shard`` a categorical
+    ``Shard`` column records each row's file.
+    """
+    paths = list(paths)
+    if not paths:
+        raise ValueError("no shard paths given")
+    if len(set(paths)) != len(paths):
+        raise ValueError("shard paths must not repeat")
+    usecols = columns_for(analysis, columns)
+    frames = await read_shards_async(paths, usecols, max_concurrency)
+    dictionaries = dictionaries if dictionaries is not None else DictionarySet()
+    for frame in frames:
+        dictionaries.encode_frame(frame)
+    df = concat_shards(frames)
+    if with_shard:
+        df[SHARD_COLUMN] = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(frames)), [len(frame) for frame in frames]), categories=paths)
+    return clean_companies(df)
+
+
+def concat_shards(frames):
+    """Concatenate typed shards column by column.
+
+    Categorical columns are combined with ``union_categoricals``, which only
+    remaps the codes of shards whose categories differ (for the dictionary
+    encoded columns they never do), so no column falls back to Python
+    strings. Empty shards are left out, as their columns carry no values to
+    infer a dtype from; a column that is all missing in a shard gets the
+    (empty) categories of the other shards' dtype.
+    """
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    data = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            reference = next((part.cat.categories for part in parts if len(part.cat.categories)), None)
+            if reference is not None:
+                parts = [part if len(part.cat.categories)
+                         else pd.Categorical.from_codes(part.cat.codes, categories=reference[:0])
+                         for part in parts]
+            data[column] = union_categoricals(parts)
+        else:
+            data[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def load_shards(paths, analysis=None, columns=None, max_concurrency=MAX_CONCURRENCY,
+                dictionaries=None, with_shard=False):
+    """Blocking wrapper around ``load_shards_async`` for scripts."""
+    return asyncio.run(load_shards_async(paths, analysis, columns, max_concurrency, dictionaries, with_shard))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""Per-stage timing and memory instrumentation for the cleaning pipeline.
+
+Wrap each step of a run in ``tracer.stage(name)`` (or decorate a function
+with ``tracer.traced(name)``) to record its wall time, CPU time, growth of
+the process's peak RSS and the rows going in and out. ``Tracer.to_json`` writes the
+records as a JSON trace; ``compare`` flags stages of a new trace that got
+slower than a baseline trace by more than a threshold.
+
+Example:
+
+    tracer = Tracer()
+    with tracer.stage('read_csv') as stage:
+        df_companies = pd.read_csv('Unicorn_Companies.csv')
+        stage.rows_out = len(df_companies)
+    with tracer.stage('str_to_num', rows_in=len(df_companies)):
+        df_companies['valuation_num'] = parse_money(df_companies['Valuation'])
+    tracer.to_json('trace.json')
+
+Comparing two traces from the command line exits with status 1 on a
+regression:
+
+    python stages.py compare baseline.json trace.json --threshold 0.2
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from benchutil import peak_rss_mib
+
+TRACE_VERSION = 1
+
+# Stages faster than this in both runs are too noisy to compare.
+MIN_SECONDS = 0.005
+
+
+class StageRecord:
+    """Measurements of one stage. Set ``rows_in`` / ``rows_out`` from inside the stage."""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_memory_bytes = None
+        self.peak_rss_growth_bytes = None
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'peak_memory_bytes': self.peak_memory_bytes,
+            'peak_rss_growth_bytes': self.peak_rss_growth_bytes,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+        }
+
+
+class Tracer:
+    """Collects ``StageRecord`` s for one run.
+
+    Every stage records how much the process's peak RSS grew while it ran
+    (``peak_rss_growth_bytes``; 0 if it stayed under an earlier peak), which
+    costs two reads of ``/proc/self/status``. ``tracemalloc`` slows
+    allocation-heavy code unevenly (1.6x to 3x on the loader), which would
+    skew the timings, so it is opt-in: with ``trace_memory=True``,
+    ``peak_memory_bytes`` is the peak of allocations above what was
+    allocated when the stage started. Nested stages are named
+    ``outer/inner``.
+    """
+
+    def __init__(self, trace_memory=False, **metadata):
+        self.trace_memory = trace_memory
+        self.metadata = metadata
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Measure the enclosed block as stage ``name``; yields its ``StageRecord``."""
+        if self._stack:
+            name = f"{self._stack[-1][0].name}/{name}"
+        record = StageRecord(name, rows_in)
+        started_tracing = False
+        base = 0
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            base, peak = tracemalloc.get_traced_memory()
+            # ``reset_peak`` is global, so remember the enclosing stage's peak so far.
+            if self._stack:
+                self._stack[-1][1][0] = max(self._stack[-1][1][0], peak)
+            tracemalloc.reset_peak()
+        peak_seen = [base]
+        self._stack.append((record, peak_seen))
+        rss = peak_rss_mib()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            record.peak_rss_growth_bytes = int((peak_rss_mib() - rss) * 2**20)
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], peak_seen[0])
+                record.peak_memory_bytes = peak - base
+                if self._stack:
+                    self._stack[-1][1][0] = max(self._stack[-1][1][0], peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+
+    def traced(self, name=None):
+        """Decorator that runs the function as a stage named ``name`` (default: its name)."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def as_dict(self):
+        return {
+            'version': TRACE_VERSION,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'metadata': self.metadata,
+            'stages': [record.as_dict() for record in self.records],
+        }
+
+    def to_json(self, path):
+        """Write the trace to ``path``."""
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def summary(self):
+        """Return the records as printable lines."""
+        lines = [f"{'stage':<28} {'wall ms':>10} {'cpu ms':>10} {'rss+ MiB':>9} {'peak MiB':>9} "
+                 f"{'rows in':>10} {'rows out':>10}"]
+        for record in self.records:
+            rss = f"{record.peak_rss_growth_bytes / 2**20:.1f}"
+            peak = '' if record.peak_memory_bytes is None else f"{record.peak_memory_bytes / 2**20:.1f}"
+            rows_in = '' if record.rows_in is None else f"{record.rows_in:,}"
+            rows_out = '' if record.rows_out is None else f"{record.rows_out:,}"
+            lines.append(f"{record.name:<28} {record.wall_seconds * 1e3:>10.1f} "
+                         f"{record.cpu_seconds * 1e3:>10.1f} {rss:>9} {peak:>9} {rows_in:>10} {rows_out:>10}")
+        return "\n".join(lines)
+
+
+def load_trace(path):
+    """Read a trace written by ``Tracer.to_json``."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.2, min_seconds=MIN_SECONDS):
+    """Return the stages of ``current`` whose wall time grew by more than ``threshold``.
+
+    ``baseline`` and ``current`` are trace dicts (see ``load_trace``). Each
+    result is ``(name, baseline_seconds, current_seconds, ratio)``. Stages
+    missing from the baseline, or faster than ``min_seconds`` in both
+    traces, are ignored.
+    """
+    before = {stage['name']: stage['wall_seconds'] for stage in baseline['stages']}
+    regressions = []
+    for stage in current['stages']:
+        old = before.get(stage['name'])
+        new = stage['wall_seconds']
+        if old is None or max(old, new) < min_seconds:
+            continue
+        ratio = new / old if old else float('inf')
+        if ratio > 1 + threshold:
+            regressions.append((stage['name'], old, new, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two stage traces.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help="flag stages that slowed down")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="allowed relative slowdown (default: %(default)s)")
+    compare_parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS)
+    args = parser.parse_args(argv)
+
+    regressions = compare(load_trace(args.baseline), load_trace(args.current),
+                          args.threshold, args.min_seconds)
+    for name, old, new, ratio in regressions:
+        print(f"REGRESSION {name}: {old * 1e3:.1f} ms -> {new * 1e3:.1f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"no stage slowed down by more than {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
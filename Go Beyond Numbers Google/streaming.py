@@ -0,0 +1,65 @@
+"""Chunked, constant-memory aggregation of company valuations per country.
+
+``df_companies.groupby('Country/Region')['valuation_num'].sum()`` needs the
+whole table in memory. ``stream_group_totals`` reads only the two columns it
+needs, ``chunksize`` rows at a time, parses the valuations per chunk and
+merges the partial per-group sums, counts and maxima, so memory is bounded by
+the chunk size and the number of groups rather than by the file size.
+"""
+
+import pandas as pd
+
+from loader import COMPANIES_CSV
+from money import BILLION, parse_money
+
+CHUNKSIZE = 100_000
+
+# How partial aggregates are combined across chunks.
+_MERGE = {'sum': 'sum', 'count': 'sum', 'max': 'max'}
+
+
+def merge_totals(totals, partial):
+    """Combine two frames of per-group ``sum``/``count``/``max`` into one."""
+    if totals is None:
+        return partial
+    return pd.concat([totals, partial]).groupby(level=0, sort=False).agg(_MERGE)
+
+
+def chunk_totals(keys, values, name=None):
+    """Return per-key ``sum``, ``count`` and ``max`` of ``values`` for one chunk.
+
+    Rows with a missing key are dropped, as ``groupby`` does by default.
+    """
+    frame = pd.DataFrame({'key': pd.Series(keys).to_numpy(dtype=object), 'value': values})
+    partial = frame.groupby('key', sort=False)['value'].agg(['sum', 'count', 'max'])
+    partial.index.name = name
+    return partial
+
+
+def iter_chunks(path=COMPANIES_CSV, columns=None, chunksize=CHUNKSIZE):
+    """Yield ``chunksize``-row frames of ``columns`` from the companies CSV."""
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def stream_group_totals(path=COMPANIES_CSV, by='Country/Region', value='Valuation',
+                        unit=BILLION, chunksize=CHUNKSIZE):
+    """Return per-``by`` ``sum``, ``count`` and ``max`` of the money column ``value``.
+
+    The result is indexed by the group values, sorted, with ``count`` as the
+    number of non-missing amounts, like ``groupby(...).agg(['sum', 'count', 'max'])``
+    over the full table.
+    """
+    totals = None
+    for chunk in iter_chunks(path, [by, value], chunksize):
+        amounts = parse_money(chunk[value], unit=unit)
+        totals = merge_totals(totals, chunk_totals(chunk[by], amounts, name=by))
+    if totals is None:
+        totals = pd.DataFrame({'sum': [], 'count': [], 'max': []}).rename_axis(by)
+    totals['count'] = totals['count'].astype('int64')
+    return totals.sort_index()
+
+
+def national_valuations(path=COMPANIES_CSV, chunksize=CHUNKSIZE):
+    """Streaming equivalent of ``df_companies.groupby('Country/Region')['valuation_num'].sum()``."""
+    totals = stream_group_totals(path, by='Country/Region', value='Valuation', chunksize=chunksize)
+    return totals['sum'].rename('valuation_num')
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""Synthetic ``Unicorn_Companies.csv`` tables of any size.
+
+The real table has 1,074 rows, too few to show how the pipeline scales, and
+repeating it (``benchutil.scale_frame``) only ever yields those 1,074
+distinct companies, dates and investor lists. ``fit_profile`` learns the
+sample's distributions and ``generate`` draws new rows from them:
+
+* (City, Country/Region, Continent) are drawn jointly, so cities are only
+  missing where the sample has them missing (Singapore, Hong Kong, Bahamas);
+* ``Industry`` and ``Valuation`` follow the sample's frequencies;
+* ``Funding`` is drawn from the sample's known amounts with a small
+  multiplicative jitter and written in the sample's ``$…M`` / ``$…B`` /
+  ``Unknown`` formats;
+* ``Date Joined`` is a sample date moved by up to ``DATE_JITTER_DAYS`` and
+  written as ``M/D/YY``; ``Year Founded`` keeps the sample's joined-minus-
+  founded lags;
+* ``Select Investors`` joins 1-4 distinct investors drawn by their
+  frequency in the sample, with the same number-per-company distribution
+  and missing rate;
+* ``Company`` is a sample name plus the row number, so names are unique.
+
+Rows are generated in chunks with one random generator per chunk, so a
+table is reproducible from ``(n_rows, seed, chunksize)`` and never needs to
+fit in memory as a whole.
+
+Usage:
+
+    python synth.py 1M synthetic_1M.csv --seed 0
+    python synth.py 10K synthetic_10K.csv --check
+"""
+
+import argparse
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dates import DATE_FORMAT
+from loader import COLUMNS, COMPANIES_CSV
+from money import MILLION, parse_money
+
+CHUNKSIZE = 1_000_000
+DATE_JITTER_DAYS = 15
+
+# Standard deviation of the log-normal factor applied to sampled funding.
+FUNDING_JITTER = 0.1
+
+LOCATION_COLUMNS = ['City', 'Country/Region', 'Continent']
+
+Profile = namedtuple('Profile', [
+    'locations', 'location_weights',
+    'industries', 'industry_weights',
+    'valuations', 'valuation_weights',
+    'funding_millions', 'funding_unknown_rate',
+    'joined_days', 'founded_lags',
+    'investors', 'investor_weights', 'investor_counts', 'investor_count_weights', 'investors_missing_rate',
+    'names',
+])
+
+
+def _frequencies(values):
+    counts = pd.Series(values).value_counts(dropna=False, sort=False)
+    return counts.index.to_numpy(dtype=object), (counts / counts.sum()).to_numpy()
+
+
+def fit_profile(df):
+    """Learn the distributions ``generate`` draws from, from a raw companies frame."""
+    locations = df[LOCATION_COLUMNS].value_counts(dropna=False, sort=False)
+    funding = parse_money(df['Funding'], unit=MILLION)
+    joined = pd.to_datetime(df['Date Joined'], format=DATE_FORMAT)
+    investor_lists = df['Select Investors'].dropna().str.split(',')
+    investors = investor_lists.explode().str.strip()
+    investors = investors[investors != '']
+    industries, industry_weights = _frequencies(df['Industry'])
+    valuations, valuation_weights = _frequencies(df['Valuation'])
+    investor_names, investor_weights = _frequencies(investors)
+    investor_counts, investor_count_weights = _frequencies(investor_lists.str.len())
+    return Profile(
+        locations=locations.index.to_frame(index=False),
+        location_weights=(locations / locations.sum()).to_numpy(),
+        industries=industries,
+        industry_weights=industry_weights,
+        valuations=valuations,
+        valuation_weights=valuation_weights,
+        funding_millions=funding[~np.isnan(funding)],
+        funding_unknown_rate=float(np.isnan(funding).mean()),
+        joined_days=joined.to_numpy().astype('datetime64[D]').astype(np.int64),
+        founded_lags=(joined.dt.year - df['Year Founded']).to_numpy(),
+        investors=investor_names,
+        investor_weights=investor_weights,
+        investor_counts=investor_counts.astype(np.int64),
+        investor_count_weights=investor_count_weights,
+        investors_missing_rate=float(df['Select Investors'].isna().mean()),
+        names=df['Company'].to_numpy(dtype=object),
+    )
+
+
+def format_money(millions):
+    """Write amounts in millions the way the sample does: ``$1B``, ``$572M``, ``Unknown`` for NaN."""
+    millions = np.asarray(millions, dtype=np.float64)
+    uniques, codes = np.unique(millions, return_inverse=True)
+    labels = np.array(['Unknown' if np.isnan(value)
+                       else f"${round(value / 1000)}B" if value >= 1000
+                       else f"${max(int(round(value)), 1)}M"
+                       for value in uniques], dtype=object)
+    return labels[codes.reshape(millions.shape)]
+
+
+def format_dates(days):
+    """Write day numbers since the epoch as ``M/D/YY`` strings."""
+    uniques, codes = np.unique(days, return_inverse=True)
+    dates = pd.DatetimeIndex(uniques.astype('datetime64[D]'))
+    labels = np.array([f"{date.month}/{date.day}/{date.year % 100:02d}" for date in dates], dtype=object)
+    return labels[codes.reshape(np.shape(days))]
+
+
+def _investor_strings(profile, n_rows, rng):
+    counts = rng.choice(profile.investor_counts, size=n_rows, p=profile.investor_count_weights)
+    width = int(counts.max()) if n_rows else 0
+    picks = rng.choice(len(profile.investors), size=(n_rows, width), p=profile.investor_weights)
+    # Redraw investors that repeat an earlier one in the same row.
+    for column in range(1, width):
+        repeated = (picks[:, [column]] == picks[:, :column]).any(axis=1)
+        while repeated.any():
+            picks[repeated, column] = rng.choice(len(profile.investors), size=int(repeated.sum()),
+                                                 p=profile.investor_weights)
+            repeated = (picks[:, [column]] == picks[:, :column]).any(axis=1)
+    names = profile.investors
+    strings = names[picks[:, 0]] if width else np.empty(0, dtype=object)
+    for column in range(1, width):
+        more = counts > column
+        strings[more] = strings[more] + ', ' + names[picks[more, column]]
+    strings[rng.random(n_rows) < profile.investors_missing_rate] = np.nan
+    return strings
+
+
+def generate(n_rows, seed=0, profile=None, start=0):
+    """Return ``n_rows`` synthetic raw companies rows, numbered from ``start``.
+
+    ``profile`` defaults to the profile of the sample CSV. ``seed`` may be
+    an int or a sequence of ints (``[seed, chunk]`` is used for chunks).
+    """
+    profile = profile or fit_profile(pd.read_csv(COMPANIES_CSV))
+    rng = np.random.default_rng(seed)
+
+    locations = profile.locations.iloc[
+        rng.choice(len(profile.locations), size=n_rows, p=profile.location_weights)].reset_index(drop=True)
+
+    joined = rng.choice(profile.joined_days, size=n_rows)
+    joined += rng.integers(-DATE_JITTER_DAYS, DATE_JITTER_DAYS + 1, size=n_rows)
+    joined = np.clip(joined, profile.joined_days.min(), profile.joined_days.max())
+    joined_year = joined.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+    funding = rng.choice(profile.funding_millions, size=n_rows)
+    funding = funding * rng.lognormal(0.0, FUNDING_JITTER, size=n_rows)
+    funding[rng.random(n_rows) < profile.funding_unknown_rate] = np.nan
+
+    numbers = pd.Series(np.arange(start, start + n_rows)).astype(str).to_numpy(dtype=object)
+    df = pd.DataFrame({
+        'Company': rng.choice(profile.names, size=n_rows) + ' ' + numbers,
+        'Valuation': rng.choice(profile.valuations, size=n_rows, p=profile.valuation_weights),
+        'Date Joined': format_dates(joined),
+        'Industry': rng.choice(profile.industries, size=n_rows, p=profile.industry_weights),
+        'City': locations['City'],
+        'Country/Region': locations['Country/Region'],
+        'Continent': locations['Continent'],
+        'Year Founded': joined_year - rng.choice(profile.founded_lags, size=n_rows),
+        'Funding': format_money(funding),
+        'Select Investors': _investor_strings(profile, n_rows, rng),
+    }, columns=COLUMNS)
+    df.index = pd.RangeIndex(start, start + n_rows)
+    return df
+
+
+def iter_synthetic(n_rows, seed=0, source=COMPANIES_CSV, chunksize=CHUNKSIZE):
+    """Yield ``n_rows`` synthetic rows as frames of at most ``chunksize`` rows."""
+    profile = fit_profile(pd.read_csv(source))
+    for chunk, start in enumerate(range(0, n_rows, chunksize)):
+        yield generate(min(chunksize, n_rows - start), seed=[seed, chunk], profile=profile, start=start)
+
+
+def write_synthetic_csv(path, n_rows, seed=0, source=COMPANIES_CSV, chunksize=CHUNKSIZE):
+    """Write ``n_rows`` synthetic rows to ``path`` chunk by chunk and return ``path``.
+
+    The file is written under a temporary name and renamed when complete, so
+    an interrupted run never leaves a truncated table behind.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        for chunk in iter_synthetic(n_rows, seed, source, chunksize):
+            chunk.to_csv(tmp, index=False, mode='a' if chunk.index[0] else 'w', header=not chunk.index[0])
+        if not n_rows:
+            pd.DataFrame(columns=COLUMNS).to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def similarity_report(sample, synthetic):
+    """Return a frame comparing summary statistics of two raw companies frames."""
+    def stats(df):
+        valuation = parse_money(df['Valuation'])
+        funding = parse_money(df['Funding'])
+        joined = pd.to_datetime(df['Date Joined'], format=DATE_FORMAT)
+        return {
+            'city missing %': 100 * df['City'].isna().mean(),
+            'investors missing %': 100 * df['Select Investors'].isna().mean(),
+            'funding unknown %': 100 * np.isnan(funding).mean(),
+            'valuation mean $B': np.nanmean(valuation),
+            'valuation median $B': np.nanmedian(valuation),
+            'funding median $B': np.nanmedian(funding),
+            'joined median year': joined.dt.year.median(),
+            'founding lag median': (joined.dt.year - df['Year Founded']).median(),
+            'investors per company': df['Select Investors'].str.count(',').add(1).mean(),
+            'top country %': 100 * df['Country/Region'].value_counts(normalize=True).iloc[0],
+            'top industry %': 100 * df['Industry'].value_counts(normalize=True).iloc[0],
+        }
+    return pd.DataFrame({'sample': stats(sample), 'synthetic': stats(synthetic)})
+
+
+def main(argv=None):
+    from benchutil import parse_rows
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rows", help="number of rows, e.g. 10K or 50M")
+    parser.add_argument("path", help="output CSV")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default=COMPANIES_CSV, help="sample to imitate (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--check", action="store_true", help="print summary statistics of sample and output")
+    args = parser.parse_args(argv)
+
+    n_rows = parse_rows(args.rows)[0]
+    write_synthetic_csv(args.path, n_rows, args.seed, args.source, args.chunksize)
+    print(f"wrote {n_rows:,} rows to {args.path} ({os.path.getsize(args.path) / 2**20:.1f} MiB)")
+    if args.check:
+        print(similarity_report(pd.read_csv(args.source), pd.read_csv(args.path)).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
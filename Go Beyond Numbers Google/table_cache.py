@@ -0,0 +1,128 @@
+"""Parquet cache of the cleaned companies table, keyed by the source file's hash.
+
+The first run pays for the CSV read and cleaning in ``loader.load_companies``
+and writes the result to ``<cache_dir>/companies-<sha256>.parquet``. Later
+runs read the Parquet file with memory mapping and column projection. A
+change to ``Unicorn_Companies.csv`` changes its hash, so a stale cache is
+never read; ``prune`` removes caches for old versions.
+
+Requires ``pyarrow``.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from loader import COMPANIES_CSV, load_companies, stage
+
+CACHE_DIR = ".cache"
+CACHE_PREFIX = "companies-"
+DIGEST_FILE = "digests.json"
+
+# Bump when the cleaned schema changes so old caches are not reused.
+CACHE_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_digest(source=COMPANIES_CSV, cache_dir=CACHE_DIR):
+    """Return the SHA-256 of ``source``, reusing a remembered digest if the file is unchanged.
+
+    Hashing a large CSV on every run would cost more than reading the cache,
+    so the digest is stored next to the cache together with the file's size
+    and modification time and only recomputed when either changes.
+    """
+    stat = os.stat(source)
+    key = os.path.abspath(source)
+    digests_path = os.path.join(cache_dir, DIGEST_FILE)
+    try:
+        with open(digests_path) as f:
+            digests = json.load(f)
+    except (OSError, ValueError):
+        digests = {}
+    entry = digests.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+    digest = file_digest(source)
+    digests[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(digests_path, "w") as f:
+        json.dump(digests, f, indent=1)
+    return digest
+
+
+def cache_path(source=COMPANIES_CSV, cache_dir=CACHE_DIR, digest=None):
+    """Return the cache file path for the current contents of ``source``."""
+    digest = digest or source_digest(source, cache_dir)
+    return os.path.join(cache_dir, f"{CACHE_PREFIX}v{CACHE_VERSION}-{digest}.parquet")
+
+
+def build_cache(source=COMPANIES_CSV, cache_dir=CACHE_DIR):
+    """Load and clean ``source`` and write it to the cache. Returns the cache path."""
+    path = cache_path(source, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    df = load_companies(source)
+    # Write to a temporary name first so a concurrent reader never sees a
+    # half-written file under the final name.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_cache(path, columns=None):
+    """Read a cache file with memory mapping, projecting to ``columns`` if given."""
+    return pd.read_parquet(path, engine="pyarrow", columns=columns, memory_map=True)
+
+
+def load_cached_companies(source=COMPANIES_CSV, columns=None, cache_dir=CACHE_DIR, rebuild=False,
+                          dictionaries=None, tracer=None):
+    """Return the cleaned companies table, building the cache if it is missing or stale.
+
+    ``columns`` selects cleaned columns (raw or derived, e.g. ``valuation_num``)
+    and only those are read from the Parquet file. ``dictionaries`` (a
+    ``dictionaries.DictionarySet``) re-encodes the categorical columns with
+    its global dictionaries; only their categories are looked up. With
+    ``tracer`` (a ``stages.Tracer``) the steps are recorded as the stages
+    ``build_cache`` (on a miss), ``read_parquet`` and ``encode``.
+    """
+    path = cache_path(source, cache_dir)
+    if rebuild or not os.path.exists(path):
+        with stage(tracer, 'build_cache'):
+            build_cache(source, cache_dir)
+    with stage(tracer, 'read_parquet') as record:
+        df = read_cache(path, columns=columns)
+        if record is not None:
+            record.rows_out = len(df)
+    if dictionaries is not None:
+        with stage(tracer, 'encode', rows_in=len(df)):
+            dictionaries.encode_frame(df)
+    return df
+
+
+def prune(source=COMPANIES_CSV, cache_dir=CACHE_DIR):
+    """Delete cache files that do not match the current ``source``. Returns the removed paths."""
+    if not os.path.isdir(cache_dir):
+        return []
+    keep = os.path.basename(cache_path(source, cache_dir))
+    removed = []
+    for name in os.listdir(cache_dir):
+        if name.startswith(CACHE_PREFIX) and name.endswith(".parquet") and name != keep:
+            os.remove(os.path.join(cache_dir, name))
+            removed.append(os.path.join(cache_dir, name))
+    return removed
+
+
+if __name__ == "__main__":
+    print(build_cache())
+    for stale in prune():
+        print(f"removed {stale}")
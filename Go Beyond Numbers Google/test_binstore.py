@@ -0,0 +1,54 @@
+"""Round trips of ``binstore`` against frames derived from ``load_companies``."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from binstore import BinaryStore, verify, write_store
+from loader import load_companies
+from shards import load_shards
+
+
+@pytest.fixture(scope='module')
+def df_companies():
+    return load_companies()
+
+
+def test_round_trip(df_companies, tmp_path):
+    verify(df_companies, write_store(df_companies, str(tmp_path / 'store')))
+
+
+def test_round_trip_sliced(df_companies, tmp_path):
+    sliced = df_companies.iloc[500:].reset_index(drop=True)
+    verify(sliced, write_store(sliced, str(tmp_path / 'store')))
+
+
+def test_round_trip_concatenated(df_companies, tmp_path):
+    combined = pd.concat([df_companies, df_companies.iloc[::-3]], ignore_index=True)
+    verify(combined, write_store(combined, str(tmp_path / 'store')))
+
+
+def test_round_trip_filtered(df_companies, tmp_path):
+    filtered = df_companies[df_companies['City'].isna() | (df_companies['Year Founded'] > 2015)]
+    verify(filtered, write_store(filtered, str(tmp_path / 'store')))
+
+
+def test_round_trip_empty(df_companies, tmp_path):
+    verify(df_companies.iloc[:0], write_store(df_companies.iloc[:0], str(tmp_path / 'store')))
+
+
+def test_round_trip_shards(tmp_path):
+    paths = []
+    for shard in range(3):
+        paths.append(str(tmp_path / f'shard-{shard}.csv'))
+        shutil.copy('Unicorn_Companies.csv', paths[-1])
+    df = load_shards(paths)
+    verify(df, write_store(df, str(tmp_path / 'store')))
+
+
+def test_rewrite_replaces_store(df_companies, tmp_path):
+    path = str(tmp_path / 'store')
+    write_store(df_companies, path)
+    write_store(df_companies.iloc[:10], path)
+    assert len(BinaryStore(path)) == 10
@@ -0,0 +1,56 @@
+"""``delta.CompanyStore`` hashes a row alike whether it came from a snapshot or ``apply_changes``."""
+
+import numpy as np
+import pytest
+
+from delta import CompanyStore, row_hashes, scan_snapshot
+from loader import COMPANIES_CSV, read_companies_csv
+
+
+@pytest.fixture(scope='module')
+def raw():
+    return read_companies_csv(COMPANIES_CSV)
+
+
+def test_snapshot_and_frame_hashes_agree(raw):
+    assert np.array_equal(scan_snapshot(COMPANIES_CSV).hashes, row_hashes(raw))
+
+
+def test_applied_rows_are_unchanged_in_snapshot(raw):
+    store = CompanyStore.from_csv()
+    # Row 629 has "N/A" investors, which reads as missing.
+    store.apply_changes(raw.iloc[[3, 627, 629]])
+    delta = store.refresh(COMPANIES_CSV)
+    assert not len(delta.added) and not len(delta.changed) and not len(delta.removed)
+
+
+def test_refresh_finds_changed_row(raw, tmp_path):
+    store = CompanyStore.from_csv()
+    edited = raw.copy()
+    edited.loc[629, 'Select Investors'] = 'Someone'
+    path = tmp_path / 'companies.csv'
+    edited.to_csv(path, index=False)
+    delta = store.refresh(str(path))
+    assert delta.changed.tolist() == [629] and not len(delta.added) and not len(delta.removed)
+    assert store.table()['Select Investors'].eq('Someone').sum() == 1
+
+
+def test_repeated_and_dead_positions_drop_once(raw):
+    store = CompanyStore.from_csv()
+    position = int(np.flatnonzero(store.frame['City'] == 'London')[0])
+    assert store.apply_changes(removed=[position, position]) == (0, 1)
+    assert store.apply_changes(removed=[position]) == (0, 0)
+    expected = CompanyStore(store.table().assign(_row_hash=0))
+    assert store.national_valuations().equals(expected.national_valuations())
+    assert store.missing_counts().equals(expected.missing_counts())
+    assert len(store.city_filter('London')) == len(expected.city_filter('London'))
+
+
+def test_repeated_keys_rejected(raw, tmp_path):
+    store = CompanyStore.from_csv()
+    with pytest.raises(ValueError):
+        store.apply_changes(raw.iloc[[3, 3]])
+    path = tmp_path / 'companies.csv'
+    raw.iloc[[0, 1, 1]].to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        store.refresh(str(path))
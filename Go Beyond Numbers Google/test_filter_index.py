@@ -0,0 +1,38 @@
+"""``FilterIndex`` answers match ``isin`` masks, for rare and common values alike."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from filter_index import FilterIndex, scan_mask
+from loader import load_companies
+
+FILTERS = [
+    {'Industry': 'Hardware', 'City': ['Beijing', 'San Francisco', 'London']},
+    {'Industry': 'Artificial intelligence', 'City': 'London'},
+    {'Industry': 'Fintech', 'Continent': 'Europe'},
+    {'Country/Region': ['United States', 'Estonia'], 'City': ['New York', 'Tallinn', 'Nowhere']},
+    {'City': []},
+    {},
+]
+
+
+@pytest.fixture(scope='module')
+def df_companies():
+    return load_companies(analysis='investor_filters')
+
+
+@pytest.mark.parametrize('filters', FILTERS, ids=repr)
+def test_matches_isin(df_companies, filters):
+    # Repeat the table so common values get bitmaps and rare ones positions.
+    df = pd.concat([df_companies] * 40, ignore_index=True)
+    index = FilterIndex(df)
+    expected = scan_mask(df, filters)
+    assert index.count(filters) == expected.sum()
+    assert np.array_equal(index.rows(filters), np.flatnonzero(expected))
+
+
+def test_any_of(df_companies):
+    index = FilterIndex(df_companies)
+    expected = scan_mask(df_companies, FILTERS[0]) | scan_mask(df_companies, FILTERS[1])
+    assert np.array_equal(index.to_mask(index.any_of(FILTERS[0], FILTERS[1])), expected)
@@ -0,0 +1,56 @@
+"""``lazy`` queries give the same answers over the CSV, the Parquet cache and the eager frame."""
+
+import numpy as np
+import pytest
+
+from lazy import col, scan_csv, scan_parquet
+from loader import load_companies
+from table_cache import build_cache
+
+PREDICATES = [
+    lambda: col('City') != 'London',
+    lambda: col('City') == 'London',
+    lambda: col('City').isin(['London', 'Beijing']),
+    lambda: col('City').isin(['London', None]),
+    lambda: (col('Industry') == 'Fintech') & (col('City') != 'London'),
+    lambda: (col('Industry') != 'Fintech') | col('City').isna(),
+    lambda: ~(col('City') != 'London'),
+    lambda: col('funding_num') >= 1,
+    lambda: (col('Year Joined') > 2020) & (col('funding_num') < 0.5),
+]
+
+
+@pytest.fixture(scope='module')
+def sources(tmp_path_factory):
+    parquet_path = build_cache(cache_dir=str(tmp_path_factory.mktemp('cache')))
+    return {'csv': scan_csv(), 'parquet': scan_parquet(parquet_path)}
+
+
+@pytest.fixture(scope='module')
+def df_companies():
+    return load_companies()
+
+
+@pytest.mark.parametrize('predicate', PREDICATES, ids=lambda predicate: repr(predicate()))
+def test_sources_agree(sources, df_companies, predicate):
+    expected = predicate().evaluate(df_companies)
+    for name, frame in sources.items():
+        filtered = frame.filter(predicate())
+        assert filtered.count_rows() == expected.sum(), name
+        assert np.array_equal(np.sort(filtered.collect()['Company'].to_numpy(dtype=object)),
+                              np.sort(df_companies['Company'][expected].to_numpy(dtype=object))), name
+
+
+def test_not_equal_keeps_missing(sources, df_companies):
+    expected = int((df_companies['City'] != 'London').sum())
+    assert sources['parquet'].filter(col('City') != 'London').count_rows() == expected
+    assert sources['csv'].filter(col('City') != 'London').count_rows() == expected
+
+
+@pytest.mark.parametrize('predicate', [None, lambda: col('City') == 'London'], ids=['all', 'London'])
+def test_chunked_collect_keeps_schema(df_companies, predicate):
+    frame = scan_csv(chunksize=100)
+    if predicate is not None:
+        frame = frame.filter(predicate())
+    collected = frame.collect()
+    assert collected.dtypes.equals(df_companies[collected.columns].dtypes)
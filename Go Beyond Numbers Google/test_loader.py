@@ -0,0 +1,56 @@
+"""``loader``, ``dates`` and their consumers on exports with missing join dates."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cohorts import CohortCube, lag_histogram
+from dates import parse_dates_with_year, year_of
+from loader import load_companies
+from maps import MAP_SPECS, country_cube, map_aggregates
+
+
+@pytest.fixture
+def blank_date_csv(tmp_path):
+    raw = pd.read_csv('Unicorn_Companies.csv')
+    raw.loc[[5, 700], 'Date Joined'] = np.nan
+    path = tmp_path / 'companies.csv'
+    raw.to_csv(path, index=False)
+    return str(path)
+
+
+def test_parse_dates_with_year_missing():
+    dates, years = parse_dates_with_year(pd.Series(['4/7/17', None, '12/1/21', '4/7/17']))
+    assert np.isnat(dates[1]) and not np.isnat(dates).any(where=[True, False, True, True])
+    assert years.dtype == 'Int16'
+    assert years.isna().tolist() == [False, True, False, False]
+    assert years[[0, 2, 3]].tolist() == [2017, 2021, 2017]
+
+
+def test_year_of_missing():
+    years = year_of(np.array(['2017-04-07', 'NaT'], dtype='datetime64[ns]'))
+    assert years[0] == 2017 and years.isna().tolist() == [False, True]
+
+
+def test_load_companies_blank_date(blank_date_csv):
+    df = load_companies(blank_date_csv)
+    expected = load_companies()
+    assert df['Date Joined'].isna().sum() == 2
+    assert df['Year Joined'].isna().sum() == 2
+    known = df['Year Joined'].notna()
+    assert (df['Year Joined'][known] == expected['Year Joined'][known]).all()
+
+
+def test_cohorts_skip_missing_years(blank_date_csv):
+    df = load_companies(blank_date_csv)
+    assert CohortCube(df).count.sum() == df['Year Joined'].notna().sum()
+    assert lag_histogram(df).to_numpy().sum() == df['Year Joined'].notna().sum()
+
+
+def test_maps_keep_missing_years(blank_date_csv):
+    cube = country_cube(load_companies(blank_date_csv))
+    expected = country_cube(load_companies())
+    for name in ('no_big4', 'europe'):
+        assert map_aggregates(cube, MAP_SPECS[name]).equals(map_aggregates(expected, MAP_SPECS[name]))
+    recent = map_aggregates(cube, MAP_SPECS['joined_after_2020'])['companies'].sum()
+    assert recent <= map_aggregates(expected, MAP_SPECS['joined_after_2020'])['companies'].sum()
@@ -0,0 +1,25 @@
+"""``ParallelEngine`` reductions equal the serial pandas ones exactly."""
+
+import pytest
+
+from benchutil import scale_frame
+from loader import load_companies
+from parallel import ParallelEngine
+
+COLUMNS = ['Industry', 'City', 'Country/Region', 'Continent', 'valuation_num', 'funding_num']
+
+
+@pytest.fixture(scope='module')
+def df():
+    return scale_frame(load_companies()[COLUMNS], 200_000)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('by, value', [('Country/Region', 'valuation_num'), ('Industry', 'funding_num'),
+                                       ('City', 'funding_num')])
+def test_group_sum_matches_pandas(df, workers, by, value):
+    expected = df.groupby(by, observed=True)[value].sum()
+    with ParallelEngine(df, workers=workers, partition_rows=30_000) as engine:
+        result = engine.group_sum(by, value)
+    assert result.index.tolist() == expected.index.tolist()
+    assert result.to_numpy().tobytes() == expected.to_numpy().tobytes()
@@ -0,0 +1,40 @@
+"""``shards.load_shards`` with empty shards next to full ones."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from loader import COMPANIES_CSV, load_companies, read_companies_csv
+from shards import load_shards
+
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    shutil.copy(COMPANIES_CSV, tmp_path / 'a.csv')
+    shutil.copy(COMPANIES_CSV, tmp_path / 'c.csv')
+    with open(COMPANIES_CSV) as f:
+        (tmp_path / 'b.csv').write_text(f.readline())
+    return tmp_path
+
+
+def test_header_only_shard(shard_dir):
+    df = load_shards([str(shard_dir / name) for name in ['a.csv', 'b.csv', 'c.csv']])
+    expected = load_companies()
+    assert len(df) == 2 * len(expected)
+    assert [str(dtype) for dtype in df.dtypes] == [str(dtype) for dtype in expected.dtypes]
+    assert df['valuation_num'].sum() == 2 * expected['valuation_num'].sum()
+
+
+def test_only_empty_shards(shard_dir):
+    assert len(load_shards([str(shard_dir / 'b.csv')])) == 0
+
+
+def test_column_missing_in_one_shard(shard_dir):
+    raw = read_companies_csv(COMPANIES_CSV)
+    raw['Funding'] = None
+    raw.to_csv(shard_dir / 'd.csv', index=False)
+    df = load_shards([str(shard_dir / 'a.csv'), str(shard_dir / 'd.csv')])
+    assert isinstance(df['Funding'].dtype, pd.CategoricalDtype)
+    assert df['funding_num'].iloc[len(raw):].isna().all()
+    assert df['funding_num'].iloc[:len(raw)].equals(load_companies()['funding_num'])
@@ -0,0 +1,29 @@
+"""``streaming`` totals equal the in-memory ``groupby`` over the whole table."""
+
+import pandas as pd
+import pytest
+
+import streaming
+from loader import COMPANIES_CSV
+from money import parse_money
+
+
+@pytest.fixture(scope='module')
+def in_memory():
+    df = pd.read_csv(COMPANIES_CSV)
+    df['valuation_num'] = parse_money(df['Valuation'])
+    return df.groupby('Country/Region')['valuation_num'].sum()
+
+
+@pytest.mark.parametrize('chunksize', [streaming.CHUNKSIZE, 100, 7])
+def test_national_valuations(in_memory, chunksize):
+    pd.testing.assert_series_equal(streaming.national_valuations(chunksize=chunksize), in_memory)
+
+
+def test_stream_group_totals_count_and_max():
+    df = pd.read_csv(COMPANIES_CSV)
+    funding = parse_money(df['Funding'])
+    expected = pd.DataFrame({'value': funding, 'key': df['Industry']}).groupby('key')['value'].agg(
+        ['sum', 'count', 'max']).rename_axis('Industry')
+    totals = streaming.stream_group_totals(by='Industry', value='Funding', chunksize=50)
+    pd.testing.assert_frame_equal(totals, expected, check_exact=False)
@@ -0,0 +1,116 @@
+"""Top-N country rankings with explicit exclusion lists.
+
+The activity gets "the top 20 countries excluding the big four" with a full
+``sort_values`` followed by ``iloc[4:]`` and ``[:20]``, which silently assumes
+that the big four are the four largest countries. ``top_n`` drops an explicit
+exclusion set and uses ``nlargest`` (partial selection) instead of a full
+sort.
+
+``RankingTotals`` keeps the per-country aggregate up to date as companies are
+appended, revalued or removed, so refreshing the ranking after a daily delta
+costs time proportional to the delta rather than to the whole table.
+"""
+
+import numpy as np
+import pandas as pd
+
+from loader import KEY_COLUMNS
+
+BIG_FOUR = ('United States', 'China', 'India', 'United Kingdom')
+
+
+def top_n(totals, n=20, exclude=()):
+    """Return the ``n`` largest values of ``totals``, leaving out the labels in ``exclude``.
+
+    ``totals`` is a Series such as ``national_valuations``. Labels in
+    ``exclude`` that are not in ``totals`` are ignored. Ties keep the first
+    label in ``totals`` order.
+
+    Example:
+
+     [IN]:  top_n(national_valuations, 20, exclude=BIG_FOUR)
+    """
+    if len(exclude):
+        totals = totals[~totals.index.isin(list(exclude))]
+    return totals.nlargest(n)
+
+
+def top_n_frame(totals, n=20, exclude=()):
+    """Like ``top_n`` but return a two-column frame, as ``reset_index()`` does in the activity."""
+    return top_n(totals, n, exclude).reset_index()
+
+
+def _keys(df, key):
+    if len(key) == 1:
+        return df[key[0]].tolist()
+    return list(zip(*(df[column].tolist() for column in key)))
+
+
+class RankingTotals:
+    """Per-group sum and count of a value, maintained incrementally by company key.
+
+    ``df`` seeds the aggregate; ``upsert`` adds new companies or replaces the
+    group and value of existing ones, and ``remove`` drops companies. Only the
+    rows in the delta are touched. ``top`` ranks the current totals.
+
+    Example:
+
+        ranking = RankingTotals(df_companies)
+        ranking.upsert(todays_changes)
+        ranking.top(20, exclude=BIG_FOUR)
+    """
+
+    def __init__(self, df, by='Country/Region', value='valuation_num', key=KEY_COLUMNS):
+        self.by = by
+        self.value = value
+        self.key = list(key)
+        grouped = df.groupby(by, observed=True, sort=False)[value]
+        self._sums = grouped.sum().to_dict()
+        self._counts = grouped.size().to_dict()
+        self._rows = dict(zip(_keys(df, self.key), zip(df[by].tolist(), df[value].tolist())))
+        if len(self._rows) != len(df):
+            raise ValueError(f"key columns {self.key} do not uniquely identify the rows")
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _add(self, group, value, sign):
+        if group is None or group != group:
+            return
+        self._sums[group] = self._sums.get(group, 0.0) + sign * (0.0 if np.isnan(value) else value)
+        self._counts[group] = self._counts.get(group, 0) + sign
+        if self._counts[group] == 0:
+            del self._sums[group]
+            del self._counts[group]
+
+    def upsert(self, df):
+        """Add the companies in ``df`` or update the ones whose key already exists."""
+        for row_key, group, value in zip(_keys(df, self.key), df[self.by].tolist(), df[self.value].tolist()):
+            old = self._rows.get(row_key)
+            if old is not None:
+                self._add(*old, -1)
+            self._rows[row_key] = (group, value)
+            self._add(group, value, 1)
+
+    def remove(self, keys):
+        """Drop the companies identified by ``keys`` (tuples of the key columns)."""
+        for row_key in keys:
+            old = self._rows.pop(row_key, None)
+            if old is not None:
+                self._add(*old, -1)
+
+    def totals(self):
+        """Return the current per-group sums as a Series sorted by group."""
+        totals = pd.Series(self._sums, name=self.value, dtype=np.float64)
+        totals.index.name = self.by
+        return totals.sort_index()
+
+    def counts(self):
+        """Return the current number of companies per group."""
+        counts = pd.Series(self._counts, dtype=np.int64)
+        counts.index.name = self.by
+        return counts.sort_index()
+
+    def top(self, n=20, exclude=()):
+        """Return the ``n`` groups with the largest totals, leaving out ``exclude``."""
+        return top_n(self.totals(), n, exclude)